@@ -13,12 +13,14 @@ setup(
     author='Brianna Noelani Ryan',
     author_email='bnryan@mit.edu',
     packages=find_packages(),
-    python_requires='>=3.6',
+    entry_points={
+        'console_scripts': ['sins=sins.sins:main', 'sins-server=sins.server:main'],
+    },
+    python_requires='>=3.7',
     install_requires=[
         'matplotlib>=2.0.0',
         'numpy>=1.15.0',
         'scipy>=1.2.0',
-        'scikit-learn>=0.20.0',
     ],
     license='BSD-2-Clause',
     classifiers=[
@@ -26,7 +28,6 @@ setup(
         'Intended Audience :: Science/Research',
         'License :: OSI Approved :: BSD License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -9,6 +9,16 @@ __version__ = "1.0.0"
 __author__ = 'Brianna Noelani Ryan'
 __credits__ = 'MIT Laboratory of Nuclear Science'
 
+# The compute core does not import matplotlib; it is loaded on the first plot
+from .sins import read_file
+from .beta import beta_decay_spectrum
+from .beta import decay_rates, path_rates
+from .ec import ec_spectrum
 from .sins import generate
+from .sins import generate_many
 from .sins import plot
-from .sins import make_csv
\ No newline at end of file
+from .sins import make_csv
+from .spectrum import Spectrum
+
+# Selects the kernel backend named by the SINS_BACKEND environment variable (NumPy by default)
+from . import backends
\ No newline at end of file
@@ -0,0 +1,5 @@
+import sys
+
+from sins.sins import main
+
+sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import contextlib
+import os
+
+import numpy as np
+
+from sins import beta
+
+DEFAULT_BACKEND = 'numpy'
+
+##########################
+### Kernel Backends
+##########################
+
+class NumpyBackend:
+    '''
+    Goal: The reference backend: the array kernel of sins.beta (μ,
+    coulomb_terms, Fermi_func, shape_factor) evaluated with NumPy and SciPy.
+    '''
+
+    name = 'numpy'
+
+    def spectrum(self, W_e, W_ν, p_e, p_ν, n, Z, A=0):
+        return beta.reference_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A)
+
+class NumbaBackend:
+    '''
+    Goal: The same kernel compiled by Numba into one loop over the energies.
+
+    Each point is evaluated by a scalar function (the λ = 1 approximation
+    of the reference kernel), with log|Γ(γ + iy)| from a Stirling series,
+    since Numba has no complex log-gamma. Compiling takes a few seconds and
+    happens once, when the backend is first selected. Needs numba.
+    '''
+
+    name = 'numba'
+
+    def __init__(self):
+        import numba
+        self._loop = _compile_numba(numba)
+
+    def spectrum(self, W_e, W_ν, p_e, p_ν, n, Z, A=0):
+        shape = np.broadcast(W_e, W_ν, p_e, p_ν, Z, A).shape
+        arrays = [np.ascontiguousarray(np.broadcast_to(np.asarray(x, dtype=float), shape)).ravel()
+                  for x in (W_e, W_ν, p_e, p_ν, Z, beta.R(Z, A))]
+        result = self._loop(*arrays, np.ascontiguousarray(beta.shape_coefficients(n)), n, beta.α)
+        return result.reshape(shape)[()]
+
+def _compile_numba(numba):
+    # Compile the scalar kernel and the loop over it
+    import math
+
+    @numba.njit(error_model='numpy')
+    def log_abs_gamma(x, y):
+        # log|Γ(x + iy)| by the Stirling series after shifting |z| up to 8
+        z = complex(x, y)
+        product = 1.
+        while abs(z) < 8 :
+            product *= abs(z)
+            z += 1
+        shift = math.log(product)
+        inverse = 1 / z
+        inverse2 = inverse * inverse
+        series = inverse * (1/12 + inverse2 * (-1/360 + inverse2 * (1/1260 + inverse2 * (-1/1680 + inverse2 * (1/1188 + inverse2 * (-691/360360 + inverse2 / 156))))))
+        return ((z - 0.5) * np.log(z) - z + series).real + 0.5 * math.log(2 * math.pi) - shift
+
+    @numba.njit(error_model='numpy')
+    def amplitudes2(Z, W, p, R, α):
+        # |μ(1)|² + |μ(-1)|² for one energy (see sins.beta.μ): both share γ and Γ(γ + iy),
+        # and their factors |1 - W| and |1 + W| add up to 2W
+        γ = math.sqrt(1 - α * α * Z * Z)
+        y = α * Z * W / p
+        ϕ = math.sqrt(2 * (γ + 1))
+        Ω = (2 * p * R)**γ * math.exp(math.pi * y / 2 + log_abs_gamma(γ, y)) / math.gamma(2 * γ + 1)
+        μ = Ω * ϕ / (2 * R * math.sqrt(W))
+        return 2 * W * μ * μ
+
+    @numba.njit(error_model='numpy')
+    def loop(W_e, W_ν, p_e, p_ν, Z, R, coefficients, n, α):
+        result = np.empty(len(W_e))
+        for i in range(len(W_e)) :
+            terms = amplitudes2(Z[i], W_e[i], p_e[i], R[i], α)
+            wave = terms / terms            # λ = 1 approximation, nan where the amplitudes are
+            shape = 0.
+            for k in range(1, n + 2) :
+                shape += coefficients[k - 1] * wave * p_e[i]**(2 * (k - 1)) * p_ν[i]**(2 * (n - k + 1))
+            fermi = terms / (2 * p_e[i]**2)
+            result[i] = fermi * shape * (p_e[i] * W_e[i]) * (W_ν[i] * p_ν[i])
+        return result
+
+    return loop
+
+BACKENDS = {'numpy': NumpyBackend, 'numba': NumbaBackend}
+_instances = {}
+_current = DEFAULT_BACKEND
+
+def register_backend(name, backend) :
+    '''
+    Goal: Add a kernel backend. backend() must build an object whose
+    spectrum(W_e, W_ν, p_e, p_ν, n, Z, A) returns the unnormalized beta
+    spectrum like sins.beta.β_spectrum, raising ImportError when its
+    dependencies are missing.
+    '''
+
+    BACKENDS[name.lower()] = backend
+
+def get_backend(name=None) :
+    # The backend instance of that name (the selected one by default), built on first use
+    name = (name or _current).lower()
+    if name not in BACKENDS :
+        raise ValueError('Unknown backend (' + name + '). Please use one of ' + ', '.join(BACKENDS) + '.')
+    if name not in _instances :
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
+def available_backends() :
+    # Names of the backends whose dependencies are installed
+    names = []
+    for name in BACKENDS :
+        try :
+            get_backend(name)
+        except ImportError :
+            continue
+        names.append(name)
+    return names
+
+def set_backend(name) :
+    '''
+    Goal: Select the backend used by β_spectrum (and so by every spectrum
+    function) from now on. The Fermi tables (tables=True) and the exact
+    Coulomb mode (see sins.beta.COULOMB_MODE) always use NumPy.
+
+    Parameters
+    -----------
+    name: str
+          numpy, numba, or a registered backend.
+    '''
+
+    global _current
+    backend = get_backend(name)
+    beta.kernel_backend = None if name.lower() == 'numpy' else backend.spectrum
+    _current = name.lower()
+
+def current_backend() :
+    return _current
+
+@contextlib.contextmanager
+def use_backend(name) :
+    # Select a backend inside a with block only
+    previous = _current
+    set_backend(name)
+    try :
+        yield get_backend(name)
+    finally :
+        set_backend(previous)
+
+# The SINS_BACKEND environment variable selects the backend at import (also in worker processes)
+if os.environ.get('SINS_BACKEND', DEFAULT_BACKEND).lower() != DEFAULT_BACKEND :
+    set_backend(os.environ['SINS_BACKEND'])
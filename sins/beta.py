@@ -6,17 +6,45 @@
 ##########################
 
 ### Imports
+import contextlib
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+
 import numpy as np
-from scipy.integrate import quad
-from scipy.special import gamma
+from scipy.special import gamma, loggamma
 from scipy.constants import physical_constants
-from sklearn import preprocessing
+
+from sins.grid import as_grid, quadrature_weights
+from sins.instrument import count, forward, timed, timer
+from sins.spectrum import Spectrum
 
 ### Define Constants
 keV = 1.
 electron_mass = 510.9989461 * keV
 α = physical_constants['fine-structure constant'][0]
 
+### Fermi Function Table Settings
+TABLE_CACHE_SIZE = 32      # Maximum number of (Z, A) tables held in memory at once
+TABLE_RTOL = 1e-6          # Relative interpolation error allowed in a table
+TABLE_MOMENTA = (1e-2, 1e2)    # Normalized momentum range covered by a table
+
+### Integrated Rate Settings
+GAUSS_ORDER = 32           # Gauss-Legendre nodes per integral in decay_rates
+
+### Coulomb Amplitude Settings
+COULOMB_MODES = ('approximate', 'exact')
+COULOMB_MODE = os.environ.get('SINS_COULOMB', 'approximate').lower()   # exact evaluates the Kummer functions at the nuclear radius
+KUMMER_RTOL = 1e-16        # Relative size of the last term summed in kummer_M
+KUMMER_MAX_TERMS = 200     # Most terms summed in kummer_M
+
+### Kernel Backend
+kernel_backend = None      # β_spectrum of the backend selected with sins.backends.set_backend (None is NumPy)
+
+### Parallel Path Settings
+PARALLEL_MIN_COST = 50000  # Estimated kernel evaluations below which paths always run serially
+
 #############################################
 ### Defining Classes
 ### Written by: Professor Joseph Formaggio
@@ -63,27 +91,29 @@ def R(Z, A=0):
     # If A is not specified, reconstruct from Z
     # Inputs:  Z (nuclear charge), A (atomic numer)
     # Output:  Nuclear radius
-    if A < 1:
-        A = 1.82 + 1.90 * Z + 0.01271 * Z**2 - 0.00006 * Z**3
+    # Z and A may be arrays (one entry per process)
+    A = np.where(np.asarray(A) < 1, 1.82 + 1.90 * Z + 0.01271 * Z**2 - 0.00006 * Z**3, A)
     radius = (0.002908 * A**(1/3) - 0.002437 * A**(-1/3))
-    return radius
+    return radius[()]
 
 def p(W, 𝜈=1):
     # Particle normalized momentum (defaults to electron if 𝜈 is unspecified)
-    # Inputs: W (normalized energy)
-    # Outputs: p (normalized momentum)
-    return np.sqrt(W**2 - 𝜈**2) if W >= 𝜈 else 0
-            # This line looks like it could vary from mine
+    # Inputs: W (normalized energy, float or array)
+    # Outputs: p (normalized momentum, zero below threshold)
+    W = np.asarray(W, dtype=float)
+    result = np.sqrt(np.where(W >= 𝜈, W**2 - 𝜈**2, 0.))
+    return result[()]
 
 def μ(k, Z, W, A=0):
     # Coulomb amplitudes for the beta decay process
     # For k = 1, this is the Fermi function
     # Inputs: 
     #         k (iteration term in sum)
-    #         W (normalized electron energy)
+    #         W (normalized electron energy, float or array)
     #         Z (progeny charge)
     #         A (atomic mass)
-    # Outputs: μ (Coulomb amplitude term for k)
+    # Outputs: μ (Coulomb amplitude term for k, same shape as W)
+    count('μ calls')
     l = np.sign(k)
     γ = np.sqrt(k**2 - α**2 * Z**2)
     y = α * Z * W / p(W)
@@ -92,48 +122,184 @@ def μ(k, Z, W, A=0):
     β = 2 * γ + 1
     omega = 2 * p(W) * R(Z, A)
     
-    # ϕ = -(k - 1j * y) * (hyp1f1(𝛋 + 1, β, 1j * omega) - l * (γ - 1j * y * hyp1f1(𝛋, β, 1j * omega)))
+    # ϕ keeps the leading order in pR, the Kummer functions at the nuclear radius are in exact_amplitudes
     ϕ = np.sqrt(2 * (γ + 1))
-    Ω = np.sqrt(np.abs(1 - l * W)) * (omega)**γ * np.exp(np.pi * y / 2) * np.abs(gamma(𝛋)) / gamma(β)
+    # exp(πy/2)|Γ(𝛋)| is formed in log space, since both factors overflow near threshold
+    Ω = np.sqrt(np.abs(1 - l * W)) * (omega)**γ * np.exp(np.pi * y / 2 + loggamma(𝛋).real) / gamma(β)
     result = Ω * ϕ / (2 * R(Z, A) * np.sqrt(W))
     return result
 
-def wave_func(k, Z, W, A=0, lambda_appproximation=True):
+def exact_coulomb():
+    # True when COULOMB_MODE selects the exact Coulomb amplitudes
+    if COULOMB_MODE not in COULOMB_MODES :
+        raise ValueError('Unknown Coulomb mode (' + str(COULOMB_MODE) + '). Please use approximate or exact.')
+    return COULOMB_MODE == 'exact'
+
+@contextlib.contextmanager
+def use_coulomb(mode):
+    # Select a Coulomb mode inside a with block only
+    global COULOMB_MODE
+    previous = COULOMB_MODE
+    COULOMB_MODE = mode.lower()
+    try :
+        exact_coulomb()
+        yield
+    finally :
+        COULOMB_MODE = previous
+
+def kummer_M(a, b, z):
+    # Confluent hypergeometric function M(a, b, z) = Σ (a)_n z^n / ((b)_n n!) for complex a and z
+    # (scipy's hyp1f1 only takes a real a), summed elementwise over arrays until the last term
+    # is below KUMMER_RTOL of the sum; |z| = 2pR stays small, so the series converges quickly
+    term = np.ones(np.broadcast(a, z).shape, dtype=complex)
+    total = term.copy()
+    for i in range(KUMMER_MAX_TERMS):
+        term = term * (a + i) / (b + i) * z / (i + 1)
+        total += term
+        # non-finite points (p_e = 0) count as converged
+        if not (np.abs(term) > KUMMER_RTOL * np.abs(total)).any() :
+            break
+    return total
+
+def _coulomb_constants(k, Z, A=0):
+    # Energy independent factors of the ±k amplitudes: γ, log Γ(2γ + 1), R and (2k - 1)!!
+    γ = np.sqrt(k**2 - α**2 * np.asarray(Z, dtype=float)**2)
+    return γ, loggamma(2 * γ + 1).real, R(Z, A), float(df2(2 * k - 1))
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def coulomb_constants(k, Z, A=0):
+    # _coulomb_constants cached per (Z, A, k), least recently used first out like fermi_table
+    return _coulomb_constants(k, Z, A)
+
+def exact_amplitudes(k_max, Z, W, A=0, k_min=1):
+    # Exact point charge Coulomb amplitudes at the nuclear radius
+    # Same as μ with ϕ = 2 Im(Φ) for k > 0 and 2 Re(Φ) for k < 0, where
+    #     Φ = e^(iη - ipR) (γ + iy) M(γ + 1 + iy, 2γ + 1, 2ipR),   e^(2iη) = -(k - iy/W) / (γ + iy)
+    # which agrees with ϕ = sqrt(2(γ + 1)) for pR -> 0
+    # The k > 1 amplitudes are divided by ((pR)^(k-1) / (2k-1)!!)², so that they tend to the k = 1
+    # amplitudes for Z -> 0 and their ratios are the λ_k of the shape factor
+    # Inputs: 
+    #         k_max, k_min (range of k)
+    #         W (normalized electron energy, float or array)
+    #         Z (progeny charge)
+    #         A (atomic mass)
+    # Outputs: amplitudes (list of (|μ(k)|², |μ(-k)|²) for k = k_min..k_max), nan at p = 0 as for μ
+    # The energy factors are computed once for every k, and M and Γ(γ + iy) once for each ±k pair
+    count('exact amplitude calls')
+    W = np.asarray(W, dtype=float)
+    p_e = p(W)
+    # points at or below threshold are evaluated at p = 1 (no divide warnings) and set to nan at the end
+    at_rest = p_e == 0
+    p_e = np.where(at_rest, 1., p_e)
+    y = α * Z * W / p_e
+    radius = R(Z, A)
+    log_omega = np.log(2 * p_e * radius)
+    shift = np.exp(-1j * p_e * radius)
+    z = 2j * p_e * radius
+    cached = np.ndim(Z) == 0 and np.ndim(A) == 0
+
+    amplitudes = []
+    for k in range(k_min, k_max + 1):
+        γ, log_gamma_β, _, norm = coulomb_constants(k, float(Z), float(A)) if cached else _coulomb_constants(k, Z, A)
+        𝛋 = γ + 1j * y
+        Φ = shift * 𝛋 * kummer_M(𝛋 + 1, 2 * γ + 1, z)
+        # Ω² / (4R²W) of μ, formed in log space
+        scale = np.exp(2 * (γ * log_omega + np.pi * y / 2 + loggamma(𝛋).real - log_gamma_β)) / (4 * radius**2 * W)
+        if k > 1 :
+            scale = scale * (norm / (p_e * radius)**(k - 1))**2
+        plus = (W - 1) * scale * (2 * (np.sqrt(-(k - 1j * y / W) / 𝛋) * Φ).imag)**2
+        minus = (W + 1) * scale * (2 * (np.sqrt(-(-k - 1j * y / W) / 𝛋) * Φ).real)**2
+        amplitudes.append((np.where(at_rest, np.nan, plus)[()], np.where(at_rest, np.nan, minus)[()]))
+    return amplitudes
+
+def coulomb_terms(k_max, Z, W, A=0, tables=False):
+    # Summed Coulomb amplitudes |μ(k)|² + |μ(-k)|² for k = 1..k_max
+    # Computed once per energy and shared by the Fermi function and the shape factor
+    # Inputs: 
+    #         k_max (largest k needed)
+    #         W (normalized electron energy, float or array)
+    #         Z (progeny charge)
+    #         A (atomic mass)
+    # Outputs: terms (list where terms[k-1] holds the k term)
+    # With tables=True the k = 1 term comes from the cached Fermi table
+    # In the exact mode every term is exact (see exact_amplitudes), from one Fermi table per k with tables=True
+    if exact_coulomb() :
+        if tables :
+            return [sum(fermi_table(Z, A, k=k, exact=True).amplitudes(W)) for k in range(1, k_max + 1)]
+        return [plus + minus for plus, minus in exact_amplitudes(k_max, Z, W, A)]
+    if tables :
+        terms = [sum(fermi_table(Z, A).amplitudes(W))]
+    else :
+        terms = [abs(μ(1, Z, W, A))**2 + abs(μ(-1, Z, W, A))**2]
+    for k in range(2, k_max + 1):
+        terms.append(abs(μ(k, Z, W, A))**2 + abs(μ(-k, Z, W, A))**2)
+    return terms
+
+def wave_func(k, Z, W, A=0, lambda_appproximation=True, tables=False, terms=None):
     # Sum of Coulomb ampliutudes to form electron wave function
     # Inputs: 
     #         k (iteration term in sum)
-    #         W (normalized electron energy)
+    #         W (normalized electron energy, float or array)
     #         Z (progeny charge)
     #         l (angular momentum term)
     #         A (atomic mass)
+    #         terms (precomputed coulomb_terms, computed here if not given)
     # Outputs: wave_func (electron wave function)
     #          Defaults to 1 in the lambda=1 appproximation
     k_eff = 1 if lambda_appproximation else k
-    term1 = abs(μ(k_eff, Z, W, A))**2 + abs(μ(-k_eff, Z, W, A))**2
-    term2 = abs(μ(1, Z, W, A))**2 + abs(μ(-1, Z, W, A))**2
-    result = term1 / term2
+    if terms is None :
+        terms = coulomb_terms(k_eff, Z, W, A, tables)
+    result = terms[k_eff - 1] / terms[0]
     return result
 
-def Fermi_func(Z, W, A=0):
-    # Fermi function based on Coulomb amplitudes
-    return (abs(μ(1, Z, W, A))**2 + abs(μ(-1, Z, W, A))**2) / (2 * p(W)**2)
-
-def shape_factor(n, Z, W, p_e, p_ν, A=0):
+def Fermi_func(Z, W, A=0, tables=False, terms=None):
+    # Fermi function based on Coulomb amplitudes (W may be a float or an array)
+    # With tables=True the amplitudes are interpolated from the cached Fermi table for (Z, A)
+    if terms is None :
+        terms = coulomb_terms(1, Z, W, A, tables)
+    return terms[0] / (2 * p(W)**2)
+
+@lru_cache(maxsize=None)
+def shape_coefficients(n):
+    # Double factorial weights df2(2n+1) / (df2(2k-1) df2(2(n-k+1)+1)) for k = 1..n+1
+    # Computed once per forbiddenness order n
+    coefficients = np.array([df2(2 * n + 1) / df2(2 * k - 1) / df2(2 * (n - k + 1) + 1) for k in range(1, n+2)])
+    coefficients.flags.writeable = False
+    return coefficients
+
+def shape_factor(n, Z, W, p_e, p_ν, A=0, tables=False, terms=None):
     # Function that computes the partial matrix elements and the Fermi function for the beta decay process
+    # W, p_e and p_ν may be floats or arrays of matching shape
+    # The exact Coulomb mode uses the λ_k of every k instead of the λ = 1 approximation
+    exact = exact_coulomb()
+    if terms is None :
+        terms = coulomb_terms(n + 1 if exact else 1, Z, W, A, tables)
+    coefficients = shape_coefficients(n)
     sum = 0.0
     for k in range(1, n+2):
-        sum += wave_func(k, Z, W, A) * p_e**(2 * (k - 1)) * p_ν**(2 * (n - k + 1)) / df2(2 * k - 1) / df2(2 * (n - k + 1) + 1)
-    return df2(2 * n + 1) * sum
+        sum += coefficients[k-1] * wave_func(k, Z, W, A, not exact, terms=terms) * p_e**(2 * (k - 1)) * p_ν**(2 * (n - k + 1))
+    return sum
 
-def β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A=0):
+def β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A=0, tables=False):
     # Calculate neutrino or electron beta decay spectrum
-    C_W = shape_factor(n, Z, W_e, p_e, p_ν, A)
-    F_Z = Fermi_func(Z, W_e)
+    # Evaluated elementwise, so a whole energy grid can be passed in one call
+    # Uses the selected kernel backend (see sins.backends), except with tables=True or exact Coulomb amplitudes
+    count('energy points', np.size(W_e))
+    if kernel_backend is not None and not tables and not exact_coulomb() :
+        return kernel_backend(W_e, W_ν, p_e, p_ν, n, Z, A)
+    return reference_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A, tables)
+
+def reference_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A=0, tables=False):
+    # The NumPy reference kernel behind β_spectrum
+    # The Coulomb terms are computed once and shared by C_W and F_Z
+    terms = coulomb_terms(n + 1 if exact_coulomb() else 1, Z, W_e, A, tables)
+    C_W = shape_factor(n, Z, W_e, p_e, p_ν, A, terms=terms)
+    F_Z = Fermi_func(Z, W_e, A, terms=terms)
     phase_space = (p_e * W_e) * (W_ν * p_ν)
     return F_Z * C_W * phase_space 
 
-def beta_spectrum(process, K_e):
-    # Beta electron spectrum
+def beta_spectrum(process, K_e, tables=False):
+    # Beta electron spectrum (K_e in keV, float or array)
     Q = process.QValue
     Z = process.progenyAtom.AtomicNumber
     A = process.parentAtom.AtomicMass
@@ -144,10 +310,10 @@ def beta_spectrum(process, K_e):
     p_e = p(W_e, 1)       # Electron momentum
     p_ν = p(W_ν, 0)       # Neutrino momentum
     
-    return β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A)
+    return β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A, tables=tables)
 
-def neutrino_spectrum(process, K_ν):
-    # Beta neutrino spectrum
+def neutrino_spectrum(process, K_ν, tables=False):
+    # Beta neutrino spectrum (K_ν in keV, float or array)
     Q = process.QValue
     Z = process.progenyAtom.AtomicNumber
     A = process.parentAtom.AtomicMass
@@ -158,35 +324,263 @@ def neutrino_spectrum(process, K_ν):
     p_ν = p(W_ν, 0)        # Neutrino momentum
     p_e = p(W_e, 1)        # Electron momentum
     
-    return β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A)
+    return β_spectrum(W_e, W_ν, p_e, p_ν, n, Z, A, tables=tables)
 
 def Γ_beta(process):
     # Integrated beta electron spectrum
-    Q = process.QValue
-    result, _ = quad(lambda K: beta_spectrum(process, K), 0, Q)
-    return max(result, 0)
+    return max(decay_rates([process])['rate'][0], 0)
 
 def Γ_ν(process):
-    # Integrated beta electron spectrum
-    Q = process
+    # Integrated beta neutrino spectrum
+    # K_ν = Q - K_e, so this is the electron integral with the neutrino as integration variable
+    return max(decay_rates([process])['rate'][0], 0)
+
+### Integrated Rates
+@lru_cache(maxsize=None)
+def gauss_nodes(order):
+    # Gauss-Legendre nodes and weights for integrals over [0, 1], after the substitution u = t²
+    # The substitution clusters nodes at u = 0, where the spectrum rises like a fractional power
+    x, w = np.polynomial.legendre.leggauss(order)
+    t = (x + 1) / 2
+    nodes, weights = t**2, t * w
+    nodes.flags.writeable = False
+    weights.flags.writeable = False
+    return nodes, weights
+
+def batch_spectrum(K_e, Q, Z, A, n, tables=False):
+    # Beta electron spectrum for many processes at once, one process per row of K_e (in keV)
+    # Q and n hold one value per row, Z and A one value per row or one for all rows (needed for tables=True)
+    # Rows are evaluated in groups of equal forbiddenness n
+    # The neutrino spectrum at K_ν is the electron spectrum at Q - K_ν
+    Q, n = np.asarray(Q, dtype=float), np.asarray(n)
+    s = np.empty(K_e.shape)
+    for order_n in np.unique(n) :
+        group = n == order_n
+        W_e = ν(K_e[group])
+        W_ν = ν(Q[group, None]) - W_e
+        Z_group = Z if np.ndim(Z) == 0 else np.asarray(Z, dtype=float)[group, None]
+        A_group = A if np.ndim(A) == 0 else np.asarray(A, dtype=float)[group, None]
+        s[group] = β_spectrum(W_e, W_ν, p(W_e, 1), p(W_ν, 0), int(order_n), Z_group, A_group, tables=tables)
+    return s
+
+def decay_rates(processes, threshold=0., order=GAUSS_ORDER):
+    ''' 
+    Goal: Integrate the spectra of many decay processes at once.
+
+    Every process is integrated with the same order-point Gauss-Legendre rule,
+    so the kernel is evaluated once on a (processes, 3 * order) array of 
+    energies per forbiddenness order instead of in a scalar loop.
+
+    Parameters
+    -----------
+    processes: list
+               The DecayProcess objects.
+    threshold: float or array
+               Kinetic energy threshold (in keV) for the fluxes above threshold,
+               one value or one per process.
+    order: int
+           Number of quadrature nodes per integral.
+
+    Returns
+    --------
+    rates: dict
+           Arrays with one entry per process: 'rate' (the integrated spectrum,
+           Γ_beta), 'mean_beta' and 'mean_nu' (mean kinetic energies in keV),
+           and 'beta_above' and 'nu_above' (fraction of electrons and 
+           neutrinos above threshold; multiply by the branching ratio for the 
+           flux per decay).
+    '''
+
+    processes = list(processes)
+    Q = np.array([process.QValue for process in processes], dtype=float)
+    Z = np.array([process.progenyAtom.AtomicNumber for process in processes], dtype=float)
+    A = np.array([process.parentAtom.AtomicMass for process in processes], dtype=float)
+    n = np.array([max(process.deltaJ - 1, 0) for process in processes], dtype=int)
+    threshold = np.broadcast_to(np.asarray(threshold, dtype=float), Q.shape)
+
+    # Electron energies for the full spectrum, the electrons above threshold
+    # and the electrons whose neutrino is above threshold
+    nodes, weights = gauss_nodes(order)
+    # (a process with Q below threshold integrates its neutrinos over an empty 
+    # range, whose nodes are placed on the full spectrum to stay finite)
+    low = np.clip(threshold, 0, Q)
+    high = Q - low
+    K_e = np.concatenate([Q[:, None] * nodes, low[:, None] + (Q - low)[:, None] * nodes, 
+                          np.where(high > 0, high, Q)[:, None] * nodes], axis=1)
+
+    s = batch_spectrum(K_e, Q, Z, A, n)
+    full, beta_above, nu_above = np.split(s * np.tile(weights, 3), 3, axis=1)
+    rate = full.sum(1) * Q
+    mean_beta = np.dot(full, nodes) * Q**2 / rate
+    return {'rate': rate,
+            'mean_beta': mean_beta,
+            'mean_nu': Q - mean_beta,
+            'beta_above': beta_above.sum(1) * (Q - low) / rate,
+            'nu_above': nu_above.sum(1) * high / rate}
+
+def path_rates(start, beta_pathes, threshold=0., order=GAUSS_ORDER):
+    ''' 
+    Goal: Integrate every beta path of an isotope in one batched call (see decay_rates).
+
+    Parameters
+    -----------
+    start: tuple
+           The information about the initial isotope. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+    beta_pathes: list
+                 All of the decay paths that are via beta.
+    threshold: float
+               Kinetic energy threshold (in keV) for the fluxes above threshold.
+    order: int
+           Number of quadrature nodes per integral.
+
+    Returns
+    --------
+    rates: dict
+           The decay_rates arrays, one entry per path.
+    '''
+
+    start_iso = Isotope(start[0], start[1], start[2], start[3], start[4])
+    processes = [SetDecayProcess(start_iso, Isotope(path[0], path[1], path[2], path[3], path[4]), path[5])
+                 for path in beta_pathes]
+    return decay_rates(processes, threshold, order)
+
+##############################################
+### Fermi Function Tables
+##############################################
+
+class FermiTable:
+    ''' 
+    Goal: Tabulate the Coulomb amplitudes and Fermi function of one daughter nucleus.
+
+    The k = ±1 amplitudes |μ(±1)|² are computed once on a log-spaced momentum 
+    grid and served afterwards by cubic interpolation in log-log space, where 
+    both are smooth down to threshold. The grid is doubled until the largest 
+    relative error at the interval midpoints is below rtol. Momenta outside 
+    the table fall back to the exact calculation. Tables of the ±k amplitudes
+    of exact_amplitudes (the exact Coulomb mode) are built the same way.
+
+    Parameters
+    -----------
+    Z: int
+       Progeny charge.
+    A: int
+       Atomic mass (0 reconstructs it from Z, as in R).
+    rtol: float
+          Relative interpolation error allowed in the table.
+    k: int
+       The amplitudes |μ(±k)|² held by the table.
+    exact: bool
+           True to tabulate exact_amplitudes rather than μ.
+    '''
+
+    def __init__(self, Z, A=0, rtol=TABLE_RTOL, momenta=TABLE_MOMENTA, k=1, exact=False):
+        from scipy.interpolate import CubicSpline
+        self.Z = Z
+        self.A = A
+        self.k = k
+        self.exact = exact
+        self.p_min, self.p_max = momenta
+
+        points = 64
+        while True :
+            log_p = np.linspace(np.log(self.p_min), np.log(self.p_max), points)
+            spline = CubicSpline(log_p, np.log(self._exact(log_p)), axis=1)
+            mid = (log_p[1:] + log_p[:-1]) / 2
+            self.error = np.max(np.abs(np.exp(spline(mid)) / self._exact(mid) - 1))
+            if self.error <= rtol or points >= 2**16 :
+                break
+            points *= 2
+        self.spline = spline
+        self.points = points
+
+    def _amplitudes(self, W):
+        # Calculated |μ(k)|² and |μ(-k)|² at the normalized electron energies W
+        if self.exact :
+            return np.array(exact_amplitudes(self.k, self.Z, W, self.A, k_min=self.k)[0])
+        return np.array([abs(μ(self.k, self.Z, W, self.A))**2, abs(μ(-self.k, self.Z, W, self.A))**2])
+
+    def _exact(self, log_p):
+        # Calculated |μ(±k)|² at the momenta exp(log_p)
+        return self._amplitudes(np.sqrt(np.exp(log_p)**2 + 1))
+
+    def amplitudes(self, W):
+        # Interpolated |μ(k)|² and |μ(-k)|² for normalized electron energies W
+        W = np.asarray(W, dtype=float)
+        p_e = np.atleast_1d(p(W))
+        inside = (p_e >= self.p_min) & (p_e <= self.p_max)
+        result = np.empty((2,) + p_e.shape)
+        result[:, inside] = np.exp(self.spline(np.log(p_e[inside])))
+        if not inside.all() :
+            result[:, ~inside] = self._amplitudes(np.atleast_1d(W)[~inside])
+        return result[0].reshape(W.shape)[()], result[1].reshape(W.shape)[()]
+
+    def F(self, W):
+        # Interpolated Fermi function for normalized electron energies W
+        plus, minus = self.amplitudes(W)
+        return (plus + minus) / (2 * p(W)**2)
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def fermi_table(Z, A=0, rtol=TABLE_RTOL, k=1, exact=False):
+    ''' 
+    Goal: Return the Fermi table for (Z, A) (and k, exact), building it on first use.
+
+    Tables are kept in a least recently used cache of TABLE_CACHE_SIZE 
+    entries, so long batch jobs do not grow memory without limit. Use 
+    fermi_table.cache_info() and fermi_table.cache_clear() to inspect or 
+    release it.
+    '''
+    return FermiTable(Z, A, rtol, k=k, exact=exact)
 
 ### Normalizing Spectra
-def normalize(data, energies, path):
-    data = data[1:-1]
-    norm_num = preprocessing.normalize([data])
-    
-    sum_track = 0
-    for i in norm_num[0] :
-        sum_track = sum_track + (i*path[5]/len(energies-2))
-    
-    num_final = []
-    for i in norm_num[0] :
-        num_final.append(i/sum_track*path[6])
-        
-    return num_final
+NORMALIZE_RTOL = 1e-3      # Allowed difference between the grid integral and Γ_beta when checking
+
+@timed('normalize')
+def normalize(data, energies, path, rule='trapezoid', check=None):
+    ''' 
+    Goal: Scale a path spectrum so it integrates to the path's branching ratio.
+
+    The spectrum is integrated on its own energies with the given quadrature 
+    rule, so non-uniform grids are normalized correctly, and scaled in one 
+    array operation. The one point where the Coulomb amplitudes are singular 
+    (p_e = 0) is filled from its neighbour first.
+
+    Parameters
+    -----------
+    data: array
+          The unnormalized spectrum at each energy.
+    energies: array
+              The energies (in keV) of the spectrum, including both endpoints.
+    path: tuple
+          The decay path. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+    rule: str
+          The quadrature rule, trapezoid or simpson (see sins.grid.quadrature_weights).
+    check: DecayProcess
+           If given, warn when the integral of data differs from Γ_beta(check) 
+           by more than NORMALIZE_RTOL.
+
+    Returns
+    --------
+    normalized: array
+                The spectrum per keV per decay.
+    '''
+
+    data = np.asarray(data, dtype=float)
+    finite = np.isfinite(data)
+    if not finite.all() :
+        data = np.interp(energies, energies[finite], data[finite])
+
+    integral = np.dot(quadrature_weights(energies, rule), data)
+    if check is not None :
+        rate = Γ_beta(check)
+        if abs(integral / rate - 1) > NORMALIZE_RTOL :
+            warnings.warn('The ' + str(path[0]) + ' path (Q = ' + str(path[5]) + ' keV) integrates to ' + 
+                          str(integral) + ' on its grid but Γ_beta gives ' + str(rate) + 
+                          '. Consider a finer energy grid.', RuntimeWarning)
+
+    return data * (path[6] / integral)
 
 ### Run all Spectra Functions
-def run_path(start, path) :
+def run_path(start, path, tables=False, grid=None, check=False) :
     ''' 
     Goal: Run the complete fermi approximation for a single path.
 
@@ -196,6 +590,13 @@ def run_path(start, path) :
            The information about the initial isotope. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
     path: tuple
           The information about the chosen decay path. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+    tables: bool
+            True to interpolate the Coulomb amplitudes from the cached Fermi tables.
+    grid: EnergyGrid
+          The energy grid to evaluate the path on (see sins.grid.as_grid). The 
+          default is a 1 keV grid up to the truncated Q value, without endpoints.
+    check: bool
+           True to cross-check the normalization against Γ_beta (see normalize).
                
     Returns
     --------
@@ -207,17 +608,29 @@ def run_path(start, path) :
               A list of the energies (in keV) that particles from this decay path may have.
     '''
     
-    energies = np.linspace(0, int(path[5]), int(path[5]) + 1)
-    start_iso = Isotope(start[0], start[1], start[2], start[3], start[4])
-    end_iso = Isotope(path[0], path[1], path[2], path[3], path[4])
-    beta = SetDecayProcess(start_iso, end_iso, int(path[5]))
-
-    s = [beta_spectrum(beta, z) for z in energies]
-    q = [neutrino_spectrum(beta, z) for z in energies]
+    grid = as_grid(grid)
+    with timer('run_path', isotope=path[0], Q=path[5]) :
+        start_iso = Isotope(start[0], start[1], start[2], start[3], start[4])
+        end_iso = Isotope(path[0], path[1], path[2], path[3], path[4])
+
+        if grid is None :
+            energies = np.linspace(0, int(path[5]), int(path[5]) + 1)
+            beta = SetDecayProcess(start_iso, end_iso, int(path[5]))
+            rule = 'trapezoid'
+        else :
+            energies = grid.energies(path[5])
+            beta = SetDecayProcess(start_iso, end_iso, path[5])
+            rule = grid.rule
+
+        s = beta_spectrum(beta, energies, tables=tables)
+        q = neutrino_spectrum(beta, energies, tables=tables)
     
-    beta_final = normalize(s, energies, path)
-    nu_final = normalize(q, energies, path)
-    energies = energies[1:-1]
+        beta_final = normalize(s, energies, path, rule, beta if check else None)
+        nu_final = normalize(q, energies, path, rule)
+
+        # the default grid leaves out both endpoints
+        if grid is None :
+            beta_final, nu_final, energies = beta_final[1:-1], nu_final[1:-1], energies[1:-1]
         
     return beta_final, nu_final, energies
 
@@ -225,37 +638,29 @@ def run_path(start, path) :
 ### Obtaining Complete Spectra
 #################################
 
-def sum_pathes(beta, nu, energies) :
+def sum_pathes(beta, nu) :
     ''' 
-    Goal: Add together all of the sum 
+    Goal: Add together all of the path spectra.
 
     Parameters
     -----------
     beta: list
-           The sets of beta spectra for the corresponding decay pathes.
+          The beta Spectrum of each decay path.
     nu: list
-        The sets of neutrino spectra for the corresponding decay pathes.
-    energies: list
-              The sets of energies for the corresponding decay pathes.
+        The neutrino Spectrum of each decay path.
 
     Returns
     --------
-    total_beta: list
-                The total fermi approximated beta spectrum
-    total_nu: list
-                The total fermi approximated neutrino spectrum
+    total_beta: Spectrum
+                The total fermi approximated beta spectrum, on the same 
+                energies as total_nu.
+    total_nu: Spectrum
+              The total fermi approximated neutrino spectrum, on the union of 
+              the path energies.
     '''
 
-    total_beta = [0] * len(energies)
-    total_nu = [0] * len(energies)
-    
-    for set in beta :
-        for i in range(len(set)) :
-            total_beta[i] += set[i]
-    
-    for set in nu :
-        for i in range(len(set)) :
-            total_nu[i] += set[i]
+    total_nu = Spectrum.total(nu)
+    total_beta = Spectrum.total(beta).rebin(total_nu.energies)
 
     return total_beta, total_nu
 
@@ -263,7 +668,43 @@ def sum_pathes(beta, nu, energies) :
 ### Combine Everything
 #########################
 
-def beta_decay_spectrum(start, beta_pathes) :
+def path_cost(start, path, grid=None) :
+    # Estimated cost of run_path: grid points times the number of shape factor terms
+    n = max(int(abs(start[3] - path[3])) - 1, 0)
+    points = int(path[5]) + 1 if grid is None else len(grid.energies(path[5]))
+    return points * (n + 1)
+
+def _run_path_with(coulomb_mode, backend, *arguments) :
+    # run_path under the given Coulomb mode and kernel backend, for executors that run in other processes
+    from sins.backends import use_backend
+    with use_coulomb(coulomb_mode), use_backend(backend) :
+        return run_path(*arguments)
+
+def run_pathes(start, beta_pathes, tables=False, workers=None, executor=None, grid=None, check=False) :
+    # run_path for every path, dispatched concurrently as described in beta_decay_spectrum
+    # Returns the run_path results in input order
+    grid = as_grid(grid)
+    n_pathes = len(beta_pathes)
+    parallel = (executor is not None or (workers or 1) > 1) and n_pathes > 1 \
+               and sum(path_cost(start, path, grid) for path in beta_pathes) >= PARALLEL_MIN_COST
+    arguments = ([start] * n_pathes, beta_pathes, [tables] * n_pathes, [grid] * n_pathes, [check] * n_pathes)
+
+    if not parallel :
+        return list(map(run_path, *arguments))
+    # pool threads record into the collector of the caller, if any (worker processes are not instrumented)
+    # other executors may run in processes, which are handed the Coulomb mode and backend of the caller
+    if executor is not None :
+        if isinstance(executor, ThreadPoolExecutor) :
+            job = forward(run_path)
+        else :
+            from sins.backends import current_backend
+            job = partial(_run_path_with, COULOMB_MODE, current_backend())
+        return list(executor.map(job, *arguments))
+    with ThreadPoolExecutor(max_workers=min(workers, n_pathes)) as pool :
+        return list(pool.map(forward(run_path), *arguments))
+
+@timed('beta_decay_spectrum')
+def beta_decay_spectrum(start, beta_pathes, tables=False, workers=None, executor=None, grid=None, check=False) :
     ''' 
     Goal: Generate the neutrino spectrum from beta.
 
@@ -271,31 +712,53 @@ def beta_decay_spectrum(start, beta_pathes) :
     -----------
     beta_paths: list
                 All of the decay paths that are via beta.
+    tables: bool
+            True to interpolate the Coulomb amplitudes from cached Fermi tables,
+            which are shared by every path with the same daughter nucleus.
+    workers: int
+             Evaluate the paths concurrently in a pool of this many threads.
+    executor: concurrent.futures.Executor
+              An existing thread or process pool to evaluate the paths in 
+              (takes precedence over workers). Worker processes run with the 
+              Coulomb mode and kernel backend selected here.
+    grid: EnergyGrid, float, str or dict
+          The energy grid for each path (see sins.grid.as_grid). By default 
+          every path is evaluated at each keV up to its truncated Q value.
+    check: bool
+           True to cross-check each path's normalization against Γ_beta.
+
+    Paths are only dispatched concurrently when their total path_cost reaches 
+    PARALLEL_MIN_COST; cheaper isotopes run serially. Paths are always summed 
+    in input order, so the result is identical to serial mode.
 
     Returns
     --------
-    energies: list
-              A list of the energies (in keV) that neutrinos from this isotope may have. 
-    total_nu: list
-              A list of the neutrino spectrum values (per keV per decay). 
-    total_beta: list
-                A list of the beta spectrum values (per keV per decay). 
+    energies: array
+              The energies (in keV) that neutrinos from this isotope may have. 
+    total_beta: Spectrum
+                The beta spectrum (per keV per decay). 
+    total_nu: Spectrum
+              The neutrino spectrum (per keV per decay). 
     '''
 
     # Generate Individual Path Spectra
     beta_spectra = []
     nu_spectra = []
-    energies = []
 
-    for path in beta_pathes :
-        beta, nu, path_energy = run_path(start, path)
-        beta_spectra.append(beta)
-        nu_spectra.append(nu)
-        
-        if len(path_energy) > len(energies) :
-            energies = path_energy
+    grid = as_grid(grid)
+    results = run_pathes(start, beta_pathes, tables, workers, executor, grid, check)
+
+    end = max(result[2][-1] for result in results)
+    for beta, nu, path_energy in results :
+        beta_spectra.append(Spectrum(path_energy, beta))
+        nu_spectra.append(Spectrum(path_energy, nu))
+
+        # on an energy grid, keep the step where each neutrino path ends below the others
+        if grid is not None and path_energy[-1] < end :
+            nu_spectra[-1] = nu_spectra[-1].closed()
     
     # Generate Complete Spectra
-    total_beta, total_nu = sum_pathes(beta_spectra, nu_spectra, energies)
+    with timer('sum_pathes') :
+        total_beta, total_nu = sum_pathes(beta_spectra, nu_spectra)
 
-    return energies, total_beta, total_nu
+    return total_nu.energies, total_beta, total_nu
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from sins import __version__, beta
+from sins.spectrum import Spectrum
+
+CACHE_MAX_BYTES = 1024**3       # Default size limit of a result cache (1 GB)
+TEMPORARY_MAX_AGE = 3600        # Seconds after which a leftover temporary file (of a crashed writer) is deleted
+
+_caches = {}        # Directory -> the ResultCache of as_cache, so its running size is kept between calls
+
+##########################
+### Result Cache
+##########################
+
+class ResultCache:
+    '''
+    Goal: Keep the outputs of generate on disk, keyed by the decay pathes.
+
+    Each entry is one .npz file named after a hash of the parsed start
+    isotope, decay pathes, energy grid, Coulomb mode and package version, so
+    editing an input file, switching to exact Coulomb amplitudes or upgrading
+    sins never returns stale spectra. Files are
+    written to a temporary name and renamed into place, so processes sharing
+    a directory only ever see complete entries. A hit refreshes the file's
+    modification time, and once the directory is over max_bytes the least
+    recently used entries are deleted. The size of the directory is scanned
+    when the cache is opened and then kept as a running total of the
+    entries stored, so the directory is only scanned again when that total
+    goes over max_bytes (entries stored by other processes are seen at that
+    scan).
+
+    Parameters
+    -----------
+    directory: str
+               The cache directory (created if needed).
+    max_bytes: int
+               Size limit of the cache directory in bytes.
+    '''
+
+    def __init__(self, directory, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = 0         # Running size of the entries, as of the last scan plus the entries stored since
+        self.evict()
+
+    def __repr__(self):
+        return 'ResultCache(' + repr(self.directory) + ')'
+
+    def key(self, start, beta_pathes, ec_pathes, grid=None):
+        # Hash of everything the spectra depend on
+        content = json.dumps([list(start), [list(path) for path in beta_pathes],
+                              [list(path) for path in ec_pathes], repr(grid), beta.COULOMB_MODE, __version__])
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, key):
+        # The cached outputs for key, or None on a miss
+        try :
+            with np.load(self.path(key)) as data :
+                outputs = []
+                for i in range(int(data['count'])) :
+                    if 'values_' + str(i) in data :
+                        outputs.append(Spectrum(data['energies_' + str(i)], data['values_' + str(i)]))
+                    else :
+                        outputs.append(data['output_' + str(i)])
+        except (OSError, KeyError, ValueError) :       # missing, evicted or unreadable entry
+            return None
+
+        try :
+            os.utime(self.path(key))
+        except OSError :
+            pass
+        return tuple(outputs)
+
+    def store(self, key, outputs):
+        # Save outputs (arrays and Spectrum objects) under key
+        arrays = {'count': np.array(len(outputs))}
+        for i, output in enumerate(outputs) :
+            if isinstance(output, Spectrum) :
+                arrays['energies_' + str(i)] = output.energies
+                arrays['values_' + str(i)] = output.values
+            else :
+                arrays['output_' + str(i)] = np.asarray(output, dtype=float)
+
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try :
+            with os.fdopen(handle, 'wb') as file :
+                np.savez(file, **arrays)
+            size = os.path.getsize(temporary)
+            os.replace(temporary, self.path(key))
+        except BaseException :
+            if os.path.exists(temporary) :
+                os.remove(temporary)
+            raise
+        self._bytes += size
+        if self._bytes > self.max_bytes :
+            self.evict()
+
+    def evict(self):
+        # Delete the least recently used entries until the cache fits in max_bytes,
+        # and the temporary files that crashed writers left behind
+        entries = []
+        expired = time.time() - TEMPORARY_MAX_AGE
+        for name in os.listdir(self.directory) :
+            if name.endswith(('.npz', '.tmp')) :
+                try :
+                    stat = os.stat(os.path.join(self.directory, name))
+                    if name.endswith('.tmp') :
+                        if stat.st_mtime < expired :
+                            os.remove(os.path.join(self.directory, name))
+                        continue
+                except OSError :
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(entry[1] for entry in entries)
+        for _, size, name in sorted(entries) :
+            if total <= self.max_bytes :
+                break
+            try :
+                os.remove(os.path.join(self.directory, name))
+            except OSError :
+                pass
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        # Delete every entry
+        for name in os.listdir(self.directory) :
+            if name.endswith('.npz') :
+                try :
+                    os.remove(os.path.join(self.directory, name))
+                except OSError :
+                    pass
+        self._bytes = 0
+
+def as_cache(cache):
+    # Turn a directory name into a ResultCache, the same one for every call in this process
+    # (None and ResultCache pass through)
+    if cache is None or isinstance(cache, ResultCache) :
+        return cache
+    directory = os.path.abspath(cache)
+    if directory not in _caches :
+        _caches[directory] = ResultCache(cache)
+    return _caches[directory]
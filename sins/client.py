@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import http.client
+import json
+import os
+import socket
+import struct
+
+import numpy as np
+
+# Only the standard library and NumPy are used here, so a script can load
+# this file on its own and skip the import of the rest of sins
+
+DEFAULT_ADDRESS = '127.0.0.1:8765'
+ARRAYS_TYPE = 'application/x-sins-arrays'
+
+##########################
+### Spectrum Client
+##########################
+
+class _UnixConnection(http.client.HTTPConnection):
+    # An HTTP connection over a Unix socket
+    def __init__(self, socket_path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+def _read_into(response, array):
+    # Fill array with the next bytes of the response
+    view = memoryview(array).cast('B')
+    filled = 0
+    while filled < len(view) :
+        read = response.readinto(view[filled:])
+        if not read :
+            raise ConnectionError('The sins server closed the connection in the middle of an array.')
+        filled += read
+    return array
+
+class SpectrumClient:
+    '''
+    Goal: Call the functions of a sins server (see sins.server.SpectrumServer).
+
+    The methods take the same decay table arguments as the server (a file,
+    or an isotope of a database) and return what the sins function returns,
+    with each Spectrum as a NumPy array of its values. One connection is kept
+    open and reused, so a client should not be shared between threads.
+
+        client = SpectrumClient('/tmp/sins.sock')
+        energy, neutrino, beta = client.generate('tests/Cs-137/cs-137.csv')
+
+    Parameters
+    -----------
+    address: str
+             'host:port' of a TCP server, or the path of a Unix socket.
+    timeout: float
+             Seconds to wait for the server (None waits as long as it takes).
+    '''
+
+    def __init__(self, address=DEFAULT_ADDRESS, timeout=None):
+        self.address = address
+        self.timeout = timeout
+        self._connection = None
+
+    def __repr__(self):
+        return 'SpectrumClient(' + repr(self.address) + ')'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._connection is not None :
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self):
+        if ':' in self.address and os.sep not in self.address :
+            host, port = self.address.rsplit(':', 1)
+            return http.client.HTTPConnection(host, int(port), timeout=self.timeout)
+        return _UnixConnection(self.address, timeout=self.timeout)
+
+    def request(self, function, params=None):
+        '''
+        Goal: Send one request and read its answer.
+
+        Returns
+        --------
+        result: dict or tuple
+                The JSON answer, or (names, arrays, info) for binary arrays.
+        '''
+
+        body = json.dumps(params or {}).encode()
+        for attempt in range(2) :
+            if self._connection is None :
+                self._connection = self._connect()
+            try :
+                self._connection.request('POST', '/' + function, body, {'Content-Type': 'application/json'})
+                response = self._connection.getresponse()
+                break
+            except (ConnectionError, http.client.HTTPException) :
+                # a kept-alive connection the server has closed is opened again once
+                self.close()
+                if attempt == 1 :
+                    raise
+
+        if response.getheader('Content-Type') != ARRAYS_TYPE :
+            value = json.loads(response.read())
+            if response.status == 200 :
+                return value
+            error = value.get('error', response.reason) if isinstance(value, dict) else response.reason
+            if response.status >= 500 :
+                raise RuntimeError('The sins server failed (' + str(response.status) + '): ' + error)
+            raise ValueError('The sins server refused the request (' + str(response.status) + '): ' + error)
+
+        length = struct.unpack('<Q', _read_into(response, bytearray(8)))[0]
+        header = json.loads(bytes(_read_into(response, bytearray(length))))
+        arrays = [_read_into(response, np.empty(size, dtype=header['dtype'])) for size in header['lengths']]
+        response.read()
+        return header['names'], arrays, header['info']
+
+    def _params(self, file, isotope, database, **params):
+        # The JSON parameters of a request, with local paths made absolute (the server may run in another directory)
+        params.update(file=file, isotope=isotope, database=database)
+        for key in ('file', 'database') :
+            if params[key] is not None and os.path.exists(params[key]) :
+                params[key] = os.path.abspath(params[key])
+        return {key: value for key, value in params.items() if value is not None}
+
+    def read_file(self, file=None, isotope=None, database=None):
+        # start_iso, beta_pathes and ec_pathes, as sins.read_file returns them
+        value = self.request('read_file', self._params(file, isotope, database))
+        return (tuple(value['start']), [tuple(path) for path in value['beta_pathes']],
+                [tuple(path) for path in value['ec_pathes']])
+
+    def beta_decay_spectrum(self, file=None, isotope=None, database=None, tables=False, grid=None):
+        # energies, total_beta and total_nu of sins.beta_decay_spectrum
+        return tuple(self.request('beta_decay_spectrum', self._params(file, isotope, database, tables=tables, grid=grid))[1])
+
+    def ec_spectrum(self, file=None, isotope=None, database=None, grid=None):
+        # energies and nu_spectrum of sins.ec_spectrum
+        return tuple(self.request('ec_spectrum', self._params(file, isotope, database, grid=grid))[1])
+
+    def generate(self, file=None, isotope=None, database=None, grid=None):
+        # The outputs of sins.generate (without writing files)
+        return tuple(self.request('generate', self._params(file, isotope, database, grid=grid))[1])
+
+    def stats(self):
+        # The counters of the server: requests, hits, misses, coalesced, errors, entries, bytes, tables, pending
+        return self.request('stats')
@@ -7,11 +7,16 @@
 
 import numpy as np
 
+from sins.grid import as_grid, trapezoid_weights
+from sins.instrument import timed
+from sins.spectrum import Spectrum
+
 ####################################################
 ### Generate Electron Capture Neutrino Spectrum
 ####################################################
 
-def ec_spectrum(ec_pathes) :
+@timed('ec_spectrum')
+def ec_spectrum(ec_pathes, grid=None, energies=None) :
     ''' 
     Goal: Generate the neutrino spectrum from electron capture.
 
@@ -19,15 +24,29 @@ def ec_spectrum(ec_pathes) :
     -----------
     ec_paths: list
               All of the decay paths that are via electron capture.
+    grid: EnergyGrid, float, str or dict
+          The energy grid up to the largest Q value (see sins.grid.as_grid). By 
+          default the spectrum is given at each keV and every line is placed 
+          at its truncated Q value.
+    energies: array
+              Place the lines on these energies instead of building a grid.
+
+    With a grid or energies, every Q value is added as a grid point and each 
+    line's height is its branching ratio divided by the trapezoid weight of 
+    that point, so the spectrum integrates to the total branching ratio.
 
     Returns
     --------
-    energies: list
-              A list of the energies (in keV) that neutrinos from this isotope may have. 
-    nu_spectrum: list
-                 A list of the neutrino spectrum values (per keV per decay). 
+    energies: array
+              The energies (in keV) that neutrinos from this isotope may have. 
+    nu_spectrum: Spectrum
+                 The neutrino spectrum (per keV per decay). 
     '''
 
+    grid = as_grid(grid)
+    if grid is not None or energies is not None :
+        return line_spectrum(ec_pathes, grid, energies)
+
     # Find Greatest Q Value
     energies = [0]
     nu_spectrum = []
@@ -41,4 +60,19 @@ def ec_spectrum(ec_pathes) :
     for path in ec_pathes : 
         nu_spectrum[int(path[0])] += path[1]
     
-    return energies, nu_spectrum
\ No newline at end of file
+    return energies, Spectrum(energies, nu_spectrum)
+
+def line_spectrum(ec_pathes, grid=None, energies=None) :
+    # Electron capture lines deposited on an EnergyGrid or on given energies
+    lines = np.array([path[0] for path in ec_pathes], dtype=float)
+    ratios = np.array([path[1] for path in ec_pathes], dtype=float)
+
+    if energies is None :
+        energies = grid.energies(lines.max())
+    energies = np.union1d(energies, lines)
+
+    index = np.searchsorted(energies, lines)
+    nu_spectrum = np.zeros(len(energies))
+    np.add.at(nu_spectrum, index, ratios / trapezoid_weights(energies)[index])
+
+    return energies, Spectrum(energies, nu_spectrum)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import numpy as np
+
+from sins.beta import GAUSS_ORDER, batch_spectrum, gauss_nodes
+
+CHUNK_ELEMENTS = 2**20     # (sample x energy) elements per kernel pass, which bounds the temporary memory
+
+##########################
+### Uncertainty Ensembles
+##########################
+
+class Ensemble:
+    '''
+    Goal: Hold the beta and neutrino spectra of every sampled parameter set
+    and summarize them per energy bin.
+
+    Attributes
+    -----------
+    energies: array
+              The energies (in keV) of the spectra.
+    beta: array
+          A (samples, energies) array of beta spectra (per keV per decay).
+    nu: array
+        A (samples, energies) array of neutrino spectra (per keV per decay).
+    parameters: dict
+                The sampled 'Q', 'branching' and 'spin' of every path, as
+                (samples, pathes) arrays.
+    '''
+
+    def __init__(self, energies, beta, nu, parameters):
+        self.energies = energies
+        self.beta = beta
+        self.nu = nu
+        self.parameters = parameters
+
+    def __repr__(self):
+        return 'Ensemble(' + str(self.nu.shape[0]) + ' samples, ' + str(len(self.energies)) + ' energies)'
+
+    def _samples(self, particle):
+        if particle.lower() not in ('neutrino', 'beta') :
+            raise ValueError('Unknown particle (' + particle + '). Please use Neutrino or Beta.')
+        return self.nu if particle.lower() == 'neutrino' else self.beta
+
+    def mean(self, particle='Neutrino'):
+        # Mean spectrum over the samples
+        return self._samples(particle).mean(axis=0)
+
+    def percentiles(self, q=(16, 50, 84), particle='Neutrino'):
+        # A (len(q), energies) array of percentile bands over the samples
+        return np.percentile(self._samples(particle), q, axis=0)
+
+    def covariance(self, particle='Neutrino'):
+        # The (energies x energies) covariance matrix of the spectrum
+        return np.cov(self._samples(particle), rowvar=False)
+
+def ensemble(start, beta_pathes, samples=1000, q_sigma=0., br_sigma=0., spins=None, energies=None,
+             rng=None, chunk_size=None, order=GAUSS_ORDER, tables=True) :
+    '''
+    Goal: Propagate Q value, spin and branching ratio uncertainties of the
+    beta pathes into the total beta and neutrino spectra.
+
+    For every path, samples parameter sets are drawn: Q from a normal
+    distribution (kept positive), the branching ratio from a normal
+    distribution (kept non-negative), and the daughter spin uniformly from a
+    list of candidates. The beta kernel is evaluated on (sample x energy)
+    arrays, chunk_size samples per pass, with the Coulomb amplitudes taken
+    from the cached Fermi table of each daughter (the electron energies of
+    the neutrino spectrum differ from sample to sample). Every sample is
+    normalized to its branching ratio with the Gauss-Legendre rate of
+    decay_rates, so the normalization does not depend on the energy grid.
+    Energies at or above a sample's Q value are zero.
+
+    Parameters
+    -----------
+    start: tuple
+           The information about the initial isotope. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+    beta_pathes: list
+                 All of the decay paths that are via beta.
+    samples: int
+             The number of parameter sets.
+    q_sigma: float or array
+             Standard deviation of each Q value in keV (one value or one per path).
+    br_sigma: float or array
+              Standard deviation of each branching ratio (one value or one per path).
+    spins: dict
+           Path index -> candidate daughter spins, for pathes whose spin is uncertain.
+    energies: array
+              The energies (in keV) of the spectra. Defaults to each keV from
+              1 keV up to the largest sampled Q value.
+    rng: numpy.random.Generator or int
+         The random generator, or a seed for a new one.
+    chunk_size: int
+                Samples per kernel pass (by default CHUNK_ELEMENTS / energies).
+    order: int
+           Gauss-Legendre nodes used to normalize each sample.
+    tables: bool
+            True to interpolate the Coulomb amplitudes from the Fermi tables
+            (see FermiTable), False for the exact calculation.
+
+    Returns
+    --------
+    ensemble: Ensemble
+    '''
+
+    rng = np.random.default_rng(rng)
+    n_pathes = len(beta_pathes)
+    q_sigma = np.broadcast_to(np.asarray(q_sigma, dtype=float), (n_pathes,))
+    br_sigma = np.broadcast_to(np.asarray(br_sigma, dtype=float), (n_pathes,))
+
+    # Draw the parameters of every path
+    Q = np.array([path[5] for path in beta_pathes]) + rng.standard_normal((samples, n_pathes)) * q_sigma
+    Q = np.maximum(Q, 1e-3)
+    branching = np.maximum(np.array([path[6] for path in beta_pathes]) + rng.standard_normal((samples, n_pathes)) * br_sigma, 0)
+    spin = np.tile([float(path[3]) for path in beta_pathes], (samples, 1))
+    for i, candidates in (spins or {}).items() :
+        spin[:, i] = rng.choice(np.asarray(candidates, dtype=float), size=samples)
+    n = np.maximum(np.abs(start[3] - spin).astype(int) - 1, 0)
+
+    if energies is None :
+        energies = np.arange(1, np.ceil(Q.max()))
+    energies = np.asarray(energies, dtype=float)
+    if chunk_size is None :
+        chunk_size = max(1, CHUNK_ELEMENTS // max(len(energies), 1))
+
+    # Evaluate and normalize every path, chunk_size samples at a time
+    nodes, weights = gauss_nodes(order)
+    beta = np.zeros((samples, len(energies)))
+    nu = np.zeros((samples, len(energies)))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore') :
+        for first in range(0, samples, chunk_size) :
+            rows = slice(first, min(first + chunk_size, samples))
+            for i, path in enumerate(beta_pathes) :
+                Q_i, n_i = Q[rows, i], n[rows, i]
+                Z, A = path[1], start[2]
+
+                rate = batch_spectrum(Q_i[:, None] * nodes, Q_i, Z, A, n_i, tables) @ weights * Q_i
+                scale = (branching[rows, i] / rate)[:, None]
+
+                # only the energies below the largest Q value of the chunk are evaluated
+                end = np.searchsorted(energies, Q_i.max())
+                inside = energies[:end] < Q_i[:, None]
+                K_e = np.broadcast_to(energies[:end], inside.shape)
+                s = batch_spectrum(np.ascontiguousarray(K_e), Q_i, Z, A, n_i, tables)
+                beta[rows, :end] += np.where(inside & np.isfinite(s), s, 0) * scale
+                s = batch_spectrum(Q_i[:, None] - K_e, Q_i, Z, A, n_i, tables)
+                nu[rows, :end] += np.where(inside & np.isfinite(s), s, 0) * scale
+
+    return Ensemble(energies, beta, nu, {'Q': Q, 'branching': branching, 'spin': spin})
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import numpy as np
+
+ADAPTIVE_POINTS = 200      # Default number of points per path for adaptive grids
+
+##########################
+### Energy Grids
+##########################
+
+class EnergyGrid:
+    '''
+    Goal: Describe the energies (in keV) a spectrum is evaluated on.
+
+    Unlike the default 1 keV grid, every EnergyGrid runs from 0 to the exact Q
+    value, so non-integer Q values such as 514.03 keV are not truncated.
+
+    Parameters
+    -----------
+    width: float
+           Spacing between points in keV. Points sit on multiples of the 
+           width, so grids of different Q values line up, and Q is added as 
+           the last point.
+    points: int
+            Number of points in each spectrum.
+    adaptive: bool
+              Place the points densely near both ends of each spectrum (the
+              low-energy Fermi function rise and the endpoint) and sparsely in
+              between, following Chebyshev-Lobatto nodes. Uses ADAPTIVE_POINTS
+              points unless points is given.
+    rule: str
+          The quadrature rule used to normalize spectra on this grid,
+          trapezoid or simpson.
+    '''
+
+    def __init__(self, width=None, points=None, adaptive=False, rule='trapezoid'):
+        if adaptive and points is None :
+            points = ADAPTIVE_POINTS
+        if (width is None) == (points is None) :
+            raise ValueError('Please give exactly one of width or points for the energy grid.')
+        if width is not None and (adaptive or width <= 0) :
+            raise ValueError('The grid width must be positive and cannot be combined with adaptive.')
+        if points is not None and points < 3 :
+            raise ValueError('The energy grid needs at least 3 points.')
+        if rule not in QUADRATURE_RULES :
+            raise ValueError('Unknown quadrature rule (' + str(rule) + '). Please use trapezoid or simpson.')
+
+        self.width = width
+        self.points = points
+        self.adaptive = adaptive
+        self.rule = rule
+
+    def __repr__(self):
+        rule = '' if self.rule == 'trapezoid' else ", rule='" + self.rule + "'"
+        if self.width is not None :
+            return 'EnergyGrid(width=' + str(self.width) + rule + ')'
+        return 'EnergyGrid(points=' + str(self.points) + ', adaptive=' + str(self.adaptive) + rule + ')'
+
+    def __eq__(self, other):
+        return isinstance(other, EnergyGrid) and \
+               (self.width, self.points, self.adaptive, self.rule) == (other.width, other.points, other.adaptive, other.rule)
+
+    def __hash__(self):
+        return hash((self.width, self.points, self.adaptive, self.rule))
+
+    def energies(self, Q):
+        # The grid points from 0 to Q (inclusive)
+        if self.width is not None :
+            energies = np.arange(0, Q, self.width)
+            energies = energies[energies < Q - 1e-6 * self.width]
+            return np.append(energies, Q)
+        if self.adaptive :
+            t = np.linspace(0, 1, self.points)
+            energies = Q * (1 - np.cos(np.pi * t)) / 2
+            energies[-1] = Q
+            return energies
+        return np.linspace(0, Q, self.points)
+
+def as_grid(grid):
+    '''
+    Goal: Turn a grid specification into an EnergyGrid.
+
+    Parameters
+    -----------
+    grid: None, EnergyGrid, float, str or dict
+          None keeps the default 1 keV grid (and returns None), a number is a
+          width in keV, 'adaptive' gives the default adaptive grid, and a dict
+          holds the EnergyGrid keyword arguments.
+
+    Returns
+    --------
+    grid: EnergyGrid or None
+    '''
+
+    if grid is None or isinstance(grid, EnergyGrid) :
+        return grid
+    if isinstance(grid, str) :
+        if grid.lower() != 'adaptive' :
+            raise ValueError('Unknown energy grid (' + grid + '). Please use a width, a dict or adaptive.')
+        return EnergyGrid(adaptive=True)
+    if isinstance(grid, dict) :
+        return EnergyGrid(**grid)
+    return EnergyGrid(width=float(grid))
+
+def trapezoid_weights(energies):
+    # Weight of each point in the trapezoid rule over the given energies
+    energies = np.asarray(energies, dtype=float)
+    weights = np.zeros(len(energies))
+    if len(energies) > 1 :
+        steps = np.diff(energies)
+        weights[:-1] += steps / 2
+        weights[1:] += steps / 2
+    return weights
+
+def simpson_weights(energies):
+    # Weight of each point in composite Simpson's rule for (possibly non-uniform) energies
+    # With an odd number of intervals the last one uses the trapezoid rule
+    energies = np.asarray(energies, dtype=float)
+    if len(energies) < 3 :
+        return trapezoid_weights(energies)
+
+    steps = np.diff(energies)
+    pairs = (len(energies) - 1) // 2
+    h0 = steps[0:2*pairs:2]
+    h1 = steps[1:2*pairs:2]
+
+    weights = np.zeros(len(energies))
+    weights[0:2*pairs:2] += (h0 + h1) / 6 * (2 - h1 / h0)
+    weights[1:2*pairs:2] += (h0 + h1)**3 / (6 * h0 * h1)
+    weights[2:2*pairs+1:2] += (h0 + h1) / 6 * (2 - h0 / h1)
+    if len(steps) % 2 :
+        weights[-2:] += steps[-1] / 2
+    return weights
+
+QUADRATURE_RULES = {'trapezoid': trapezoid_weights, 'simpson': simpson_weights}
+
+def quadrature_weights(energies, rule='trapezoid'):
+    # Weight of each point in the given quadrature rule, so that an integral is np.dot(weights, values)
+    return QUADRATURE_RULES[rule](energies)
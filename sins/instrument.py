@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import contextlib
+import contextvars
+import threading
+import time
+from functools import wraps
+
+# The Stats being collected, or None when instrumentation is off. A context
+# variable keeps the collectors of different threads and tasks apart
+_active = contextvars.ContextVar('sins_stats', default=None)
+_NULL = contextlib.nullcontext()
+
+##########################
+### Collected Statistics
+##########################
+
+class Stats:
+    '''
+    Goal: Hold the timers, counters and per-path timings recorded while
+    collect() is active.
+
+    Attributes
+    -----------
+    timers: dict
+            Stage name -> [number of calls, total seconds]. Nested stages
+            (run_path inside beta_decay_spectrum) are each counted in full.
+    counters: dict
+              Counter name -> total, e.g. 'μ calls', 'energy points' and
+              'bytes written'.
+    events: list
+            One dict per timed call that carried extra information, such as
+            {'name': 'run_path', 'seconds': ..., 'isotope': ..., 'Q': ...}.
+    profile: pstats.Stats
+             The cProfile statistics when collect(profile=True), otherwise None.
+    '''
+
+    def __init__(self):
+        self.timers = {}
+        self.counters = {}
+        self.events = []
+        self.profile = None
+        self._lock = threading.Lock()       # pool threads record into the same Stats
+
+    def __repr__(self):
+        return 'Stats(' + str(len(self.timers)) + ' timers, ' + str(len(self.counters)) + ' counters)'
+
+    def add_time(self, name, seconds, info=None):
+        with self._lock :
+            timer = self.timers.setdefault(name, [0, 0.])
+            timer[0] += 1
+            timer[1] += seconds
+            if info :
+                self.events.append(dict(info, name=name, seconds=seconds))
+
+    def add(self, name, amount=1):
+        with self._lock :
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        # JSON serializable copy of the timers, counters and events
+        return {'timers': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.timers.items()},
+                'counters': dict(self.counters),
+                'events': [dict(event) for event in self.events]}
+
+    def report(self):
+        # Readable table of the timers (slowest first) and counters
+        lines = [f"{'stage':<24} {'calls':>8} {'seconds':>10}"]
+        for name, (calls, seconds) in sorted(self.timers.items(), key=lambda item: -item[1][1]) :
+            lines.append(f"{name:<24} {calls:>8} {seconds:>10.4f}")
+        for name, value in self.counters.items() :
+            lines.append(f"{name:<24} {value:>19}")
+        return '\n'.join(lines)
+
+class _Timer:
+    # Context manager adding the time spent inside it to a Stats
+    __slots__ = ('stats', 'name', 'info', 'start')
+
+    def __init__(self, stats, name, info):
+        self.stats = stats
+        self.name = name
+        self.info = info
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.name, time.perf_counter() - self.start, self.info)
+        return False
+
+##########################
+### Recording
+##########################
+
+def timer(name, **info):
+    '''
+    Goal: Time a block of code: with timer('merge'): ...
+
+    Keyword arguments are stored with this call in Stats.events. When
+    nothing is being collected a shared do-nothing context is returned.
+    '''
+
+    stats = _active.get()
+    if stats is None :
+        return _NULL
+    return _Timer(stats, name, info)
+
+def timed(name):
+    # Decorator timing every call of a function under name
+    def decorate(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            stats = _active.get()
+            if stats is None :
+                return function(*args, **kwargs)
+            with _Timer(stats, name, None) :
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, amount=1):
+    # Add amount to a counter (does nothing when nothing is being collected)
+    stats = _active.get()
+    if stats is not None :
+        stats.add(name, amount)
+
+def forward(function):
+    # function recording into the Stats of the caller, for pool threads (which start with no collector)
+    stats = _active.get()
+    if stats is None :
+        return function
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        token = _active.set(stats)
+        try :
+            return function(*args, **kwargs)
+        finally :
+            _active.reset(token)
+    return wrapper
+
+@contextlib.contextmanager
+def collect(callback=None, profile=False):
+    '''
+    Goal: Record timers and counters for everything run inside the block.
+
+        with collect() as stats :
+            generate('tests/Ir-192/ir-192.csv', False)
+        print(stats.report())
+
+    Only the calling thread (or asyncio task) is instrumented: blocks opened
+    at the same time in other threads record on their own, and blocks may be
+    nested, the inner one recording on its own. Worker threads see the block
+    only when handed to them with forward(), as run_pathes does; the worker
+    processes (of generate_many, or a process executor) are not instrumented.
+
+    Parameters
+    -----------
+    callback: callable
+              Called with the Stats when the block ends.
+    profile: bool
+             True to also run cProfile over the block and keep the result in
+             Stats.profile (a pstats.Stats).
+
+    Returns
+    --------
+    stats: Stats
+           The statistics, filled in as the block runs.
+    '''
+
+    stats = Stats()
+    token = _active.set(stats)
+    profiler = None
+    if profile :
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try :
+        yield stats
+    finally :
+        if profiler is not None :
+            import pstats
+            profiler.disable()
+            stats.profile = pstats.Stats(profiler)
+        _active.reset(token)
+        if callback is not None :
+            callback(stats)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import csv
+import os
+
+import numpy as np
+
+from sins.grid import as_grid
+from sins.sins import cached_spectra, read_file
+from sins.spectrum import Spectrum
+
+##########################
+### Source Inventory
+##########################
+
+def read_inventory(file_name) :
+    '''
+    Goal: Read an inventory csv file with the columns File, Activity and
+    Half-life (one isotope per row). File names are relative to the
+    inventory file.
+
+    Returns
+    --------
+    sources: list
+             One (file_name, activity, half_life) tuple per row.
+    '''
+
+    directory = os.path.dirname(file_name)
+    sources = []
+    with open(file_name) as file :
+        reader = csv.reader(file)
+        next(reader)
+        for row in reader :
+            if not row :
+                continue
+            if len(row) != 3 :
+                raise Exception('Inventory file is not the right dimensions. Please make sure each row has a value for File, Activity and Half-life.')
+            sources.append((os.path.join(directory, row[0].strip()), float(row[1]), float(row[2])))
+    return sources
+
+class Inventory:
+    '''
+    Goal: The neutrino and beta spectra of a source made of many isotopes
+    whose activities decay over time.
+
+    Each isotope's spectra (per keV per decay) are generated once and
+    interpolated onto one common energy grid, as the rows of an (isotopes x
+    energies) matrix. The spectra at any number of times are then one
+    (times x isotopes) @ (isotopes x energies) product. Every isotope decays
+    on its own (A(t) = A0 exp(-ln2 t / half_life)); ingrowth from parent
+    isotopes is not followed.
+
+    Activities and half-lives share one time unit with the times passed in:
+    with activities in Bq and half-lives in seconds, spectra are in particles
+    per keV per second and integrated spectra in particles per keV.
+
+    Parameters
+    -----------
+    sources: list or str
+             (file_name, activity, half_life) tuples, where file_name is an
+             isotope csv file as read by read_file, or the name of an
+             inventory csv file (see read_inventory). A half-life of inf is a
+             constant activity.
+    grid: EnergyGrid, float, str or dict
+          The energy grid of each isotope (see sins.grid.as_grid).
+    cache: str or ResultCache
+           A result cache for the isotope spectra (see sins.sins.generate).
+    '''
+
+    def __init__(self, sources, grid=None, cache=None):
+        if isinstance(sources, str) :
+            sources = read_inventory(sources)
+        if len(sources) == 0 :
+            raise ValueError('The inventory needs at least one isotope.')
+
+        self.grid = as_grid(grid)
+        self.names = []
+        self.activities = np.array([source[1] for source in sources], dtype=float)
+        self.half_lives = np.array([source[2] for source in sources], dtype=float)
+        if (self.half_lives <= 0).any() :
+            raise ValueError('Every half-life must be positive.')
+        self.decay_constants = np.log(2) / self.half_lives
+
+        # Generate each isotope once
+        nu_spectra = []
+        beta_spectra = []
+        for file_name, _, _ in sources :
+            start, beta_pathes, ec_pathes = read_file(file_name)
+            outputs = cached_spectra(start, beta_pathes, ec_pathes, self.grid, cache)
+            self.names.append(start[0])
+            nu_spectra.append(Spectrum(outputs[0], outputs[1]))
+            if beta_pathes == [] :
+                beta_spectra.append(Spectrum([], []))
+            elif ec_pathes == [] :
+                beta_spectra.append(Spectrum(outputs[0], outputs[2]))
+            else :
+                beta_spectra.append(Spectrum(outputs[2], outputs[3]))
+
+        # Put them on one energy grid
+        self.energies = Spectrum.union([spectrum for spectrum in nu_spectra + beta_spectra if len(spectrum) > 0])
+        self.nu_matrix = np.vstack([spectrum.at(self.energies) for spectrum in nu_spectra])
+        self.beta_matrix = np.vstack([spectrum.at(self.energies) for spectrum in beta_spectra])
+
+    def __repr__(self):
+        return 'Inventory(' + ', '.join(self.names) + ')'
+
+    def activity(self, times):
+        '''
+        Goal: The activity of each isotope at the given times.
+
+        Returns
+        --------
+        activities: array
+                    A (times, isotopes) array.
+        '''
+
+        times = np.atleast_1d(np.asarray(times, dtype=float))
+        return self.activities * np.exp(-np.outer(times, self.decay_constants))
+
+    def decays(self, t_start, t_stop):
+        '''
+        Goal: The number of decays of each isotope between t_start and t_stop
+        (arrays of equal length for many windows).
+
+        Returns
+        --------
+        decays: array
+                A (windows, isotopes) array.
+        '''
+
+        t_start = np.atleast_1d(np.asarray(t_start, dtype=float))[:, None]
+        t_stop = np.atleast_1d(np.asarray(t_stop, dtype=float))[:, None]
+        λ = self.decay_constants
+        with np.errstate(divide='ignore', invalid='ignore') :
+            decays = self.activities * (np.exp(-λ * t_start) - np.exp(-λ * t_stop)) / λ
+        return np.where(λ > 0, decays, self.activities * (t_stop - t_start))
+
+    def spectra(self, times):
+        '''
+        Goal: The total spectra of the source at the given times.
+
+        Parameters
+        -----------
+        times: float or array
+               The times since the activities were given.
+
+        Returns
+        --------
+        energies: array
+                  The energies (in keV) of the spectra.
+        beta: array
+              A (times, energies) array of beta spectra (per keV per unit time).
+        nu: array
+            A (times, energies) array of neutrino spectra (per keV per unit time).
+        '''
+
+        activity = self.activity(times)
+        return self.energies, activity @ self.beta_matrix, activity @ self.nu_matrix
+
+    def integrated(self, t_start, t_stop):
+        '''
+        Goal: The total spectra of the source integrated over time windows.
+
+        Parameters
+        -----------
+        t_start: float or array
+                 The start of each window.
+        t_stop: float or array
+                The end of each window.
+
+        Returns
+        --------
+        energies: array
+                  The energies (in keV) of the spectra.
+        beta: array
+              A (windows, energies) array of beta spectra (per keV).
+        nu: array
+            A (windows, energies) array of neutrino spectra (per keV).
+        '''
+
+        decays = self.decays(t_start, t_stop)
+        return self.energies, decays @ self.beta_matrix, decays @ self.nu_matrix
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import contextlib
+import io
+import json
+import os
+import stat
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b'SINSLIB1'
+HEADER = struct.Struct('<8sQQ')     # magic, index offset, index length (in bytes)
+HEADER_SIZE = 64                    # the header is padded to this, and every array starts on a multiple of it
+PARTICLES = ('Neutrino', 'Beta')
+
+##########################
+### Spectral Library
+##########################
+
+def output_spectra(outputs) :
+    # The (energies, values) arrays of each particle in the outputs of generate
+    arrays = [np.asarray(output, dtype=float) for output in outputs]
+    spectra = {'Neutrino': (arrays[0], arrays[1])}
+    if len(arrays) == 3 :
+        spectra['Beta'] = (arrays[0], arrays[2])
+    elif len(arrays) == 4 :
+        spectra['Beta'] = (arrays[2], arrays[3])
+    return spectra
+
+def _build_one(source, cache=None, database=None, grid=None) :
+    # Parse and generate one source of SpectrumLibrary.build, capturing its printed progress and any failure
+    # Returns (source, (isotope, outputs, metadata), None), or (source, None, error)
+    from sins.nuclides import as_database
+    from sins.sins import cached_spectra, read_file, spectrum_metadata
+    try :
+        with contextlib.redirect_stdout(io.StringIO()) :
+            start, beta_pathes, ec_pathes = as_database(database)[source] if database is not None else read_file(source)
+            outputs = cached_spectra(start, beta_pathes, ec_pathes, grid, cache)
+        return source, (start[0], outputs, spectrum_metadata(start, beta_pathes, ec_pathes, grid)), None
+    except Exception as e :
+        return source, None, type(e).__name__ + ': ' + str(e)
+
+class SpectrumLibrary:
+    '''
+    Goal: Keep the spectra of many isotopes in one binary file that is read
+    through a memory map.
+
+    The file starts with a small header that points to a JSON index (isotope
+    -> byte offset and length of each energies and values array, plus the
+    metadata of generate, including the grid). The arrays are little-endian
+    float64 and start on 64 byte boundaries. Readers map the file once with
+    numpy.memmap and get read-only views of any spectrum without copying it,
+    so processes reading the same library share its pages. Adding or
+    updating isotopes appends their arrays and a new index to the end of the
+    file and then rewrites the header, so the rest of the file is never
+    rewritten and readers always find a complete index; replaced data stays
+    in the file until compact(). One process should write at a time.
+
+        library = SpectrumLibrary('spectra.sinslib')
+        library.build('tests/*/*.csv')
+        energies, values = library.spectrum('Ir-192')
+
+    Parameters
+    -----------
+    file_name: str
+               The library file, created (empty) when it does not exist.
+    '''
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        if not os.path.exists(file_name) or os.path.getsize(file_name) == 0 :
+            with open(file_name, 'wb') as file :
+                index = json.dumps({}).encode()
+                file.write(HEADER.pack(MAGIC, HEADER_SIZE, len(index)).ljust(HEADER_SIZE, b'\0') + index)
+        self.reload()
+
+    def __repr__(self):
+        return 'SpectrumLibrary(' + repr(self.file_name) + ', ' + str(len(self)) + ' isotopes)'
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return str(name).lower() in self.index
+
+    @property
+    def names(self):
+        return [entry['name'] for entry in self.index.values()]
+
+    def reload(self):
+        # Read the header and index again, e.g. after another process added isotopes
+        with open(self.file_name, 'rb') as file :
+            magic, offset, length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC :
+                raise ValueError('The file ' + self.file_name + ' is not a sins spectrum library.')
+            file.seek(offset)
+            self.index = json.loads(file.read(length).decode())
+        self._offset = offset
+        self._data = None
+
+    def _entry(self, name):
+        key = str(name).lower()
+        if key not in self.index :
+            raise KeyError('The isotope ' + str(name) + ' is not in the library.')
+        return self.index[key]
+
+    def _array(self, offset, length):
+        # A read-only float64 view of the mapped file
+        if self._data is None :
+            self._data = np.memmap(self.file_name, dtype=np.uint8, mode='r', shape=(self._offset,))
+        return self._data[offset:offset + 8 * length].view('<f8')
+
+    def spectrum(self, name, particle='Neutrino'):
+        '''
+        Goal: One spectrum of an isotope (the name is not case sensitive).
+
+        Returns
+        --------
+        energies: array
+                  The energies (in keV), a read-only view of the file.
+        values: array
+                The spectrum (per keV per decay), a read-only view of the file.
+        '''
+
+        entry = self._entry(name)
+        particle = particle.capitalize()
+        if particle not in PARTICLES :
+            raise ValueError('Unknown particle (' + particle + '). Please use Neutrino or Beta.')
+        if particle not in entry['spectra'] :
+            raise KeyError('The isotope ' + entry['name'] + ' has no ' + particle.lower() + ' spectrum.')
+        energies, values, length = entry['spectra'][particle]
+        return self._array(energies, length), self._array(values, length)
+
+    def metadata(self, name):
+        # The stored description of how an isotope's spectra were generated (see spectrum_metadata)
+        return self._entry(name)['metadata']
+
+    def add(self, name, outputs, metadata=None):
+        '''
+        Goal: Add the outputs of generate for one isotope, replacing it if it
+        is already in the library.
+        '''
+
+        self._append({name: (outputs, metadata)})
+
+    def remove(self, name):
+        # Drop an isotope from the index (its data is freed by compact)
+        self._entry(name)
+        index = dict(self.index)
+        del index[str(name).lower()]
+        self._write([], index)
+
+    def build(self, sources, grid=None, workers=None, cache=None, database=None):
+        '''
+        Goal: Generate many isotopes in parallel and add them all with one
+        update of the file.
+
+        Parameters
+        -----------
+        sources: str or list
+                 csv files, glob patterns or directories, or isotope names of
+                 the database (see sins.sins.generate_many).
+        grid: EnergyGrid, float, str or dict
+              The energy grid (see sins.grid.as_grid).
+        workers: int
+                 The number of worker processes.
+        cache: str or ResultCache
+               A result cache (see sins.sins.generate).
+        database: str or NuclideDB
+                  A decay table in which sources are isotope names.
+
+        Returns
+        --------
+        results: list
+                 One (source, isotope, error) tuple per source, in input
+                 order; error is None, or isotope is None and error
+                 describes why the source failed.
+        '''
+
+        from sins.grid import as_grid
+        from sins.sins import _expand_files, _run_many
+
+        sources = [sources] if isinstance(sources, str) else sources
+        if database is None :
+            sources = _expand_files(sources)
+
+        # each worker parses its source once and sends back the isotope with its spectra
+        results = []
+        added = {}
+        for source, isotope, error in _run_many(_build_one, sources, workers, cache, database, as_grid(grid)) :
+            if error is None :
+                name, outputs, metadata = isotope
+                added[name] = (outputs, metadata)
+                results.append((source, name, None))
+            else :
+                results.append((source, None, error))
+        self._append(added)
+        return results
+
+    def _append(self, isotopes):
+        # Write the arrays of {name: (outputs, metadata)} after the current end of the file,
+        # then the new index and the header
+        index = dict(self.index)
+        arrays = []
+        position = _aligned(os.path.getsize(self.file_name))
+        for name, (outputs, metadata) in isotopes.items() :
+            spectra = {}
+            written = {}        # arrays shared by both spectra (the energies) are stored once
+            for particle, (energies, values) in output_spectra(outputs).items() :
+                if len(energies) != len(values) :
+                    raise ValueError('The ' + particle.lower() + ' energies and values of ' + name + ' differ in length.')
+                for array in (energies, values) :
+                    if id(array) not in written :
+                        arrays.append((position, array))
+                        written[id(array)] = position
+                        position = _aligned(position + 8 * len(array))
+                spectra[particle] = [written[id(energies)], written[id(values)], len(energies)]
+            index[name.lower()] = {'name': name, 'spectra': spectra, 'metadata': metadata or {}}
+        self._write(arrays, index)
+
+    def _write(self, arrays, index):
+        # Append the arrays (at their given offsets) and the index, then point the header at the new index
+        content = json.dumps(index).encode()
+        with open(self.file_name, 'r+b') as file :
+            for offset, array in arrays :
+                file.seek(offset)
+                file.write(np.ascontiguousarray(array, dtype='<f8').tobytes())
+            end = _aligned(max([offset + 8 * len(array) for offset, array in arrays], default=os.path.getsize(self.file_name)))
+            file.seek(end)
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, end, len(content)))
+            file.flush()
+        self.reload()
+
+    def garbage(self):
+        # Bytes of replaced or removed spectra, old indexes and padding, which compact frees
+        arrays = {(offset, spectrum[2]) for entry in self.index.values()
+                  for spectrum in entry['spectra'].values() for offset in spectrum[:2]}
+        return self._offset - HEADER_SIZE - sum(8 * length for _, length in arrays)
+
+    def compact(self):
+        '''
+        Goal: Rewrite the library without replaced data. The new file is
+        written next to the old one and renamed into place, so open readers
+        keep their (old) mapping.
+        '''
+
+        directory = os.path.dirname(os.path.abspath(self.file_name))
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(handle)
+        try :
+            isotopes = {}
+            for entry in self.index.values() :
+                # back to the outputs of generate, with energies shared by both spectra kept shared
+                outputs = list(self.spectrum(entry['name'], 'Neutrino'))
+                if 'Beta' in entry['spectra'] :
+                    energies, values = self.spectrum(entry['name'], 'Beta')
+                    shared = entry['spectra']['Beta'][0] == entry['spectra']['Neutrino'][0]
+                    outputs += [values] if shared else [energies, values]
+                isotopes[entry['name']] = (outputs, entry['metadata'])
+            SpectrumLibrary(temporary)._append(isotopes)
+            # mkstemp makes the file private; keep the permissions of the library it replaces
+            os.chmod(temporary, stat.S_IMODE(os.stat(self.file_name).st_mode))
+            os.replace(temporary, self.file_name)
+        except BaseException :
+            if os.path.exists(temporary) :
+                os.remove(temporary)
+            raise
+        self.reload()
+
+def _aligned(position) :
+    # The next array boundary at or after position
+    return -(-max(position, HEADER_SIZE) // HEADER_SIZE) * HEADER_SIZE
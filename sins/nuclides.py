@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import csv
+import io
+import os
+
+import numpy as np
+
+DECAY_TYPES = ('start', 'beta', 'ec')       # Type codes 0, 1 and 2 of the decay table
+COLUMNS = ('Decay', 'Isotope', 'Z', 'A', 'Spin', 'Parity', 'Q', 'Branching Ratio')
+DATABASE_CACHE_SIZE = 8                     # Databases kept by as_database, keyed by file
+MAX_ERRORS = 20                             # Problems listed in the error of a bad table
+
+##########################
+### Decay Table Parser
+##########################
+
+def _raise(errors) :
+    # One ValueError for every problem found (up to MAX_ERRORS of them)
+    more = len(errors) - MAX_ERRORS
+    raise ValueError('\n'.join(errors[:MAX_ERRORS] + (['... and ' + str(more) + ' more.'] if more > 0 else [])))
+
+def is_table(source) :
+    # A string holding a decay table itself rather than a file name: one with a line break, or
+    # one with a comma that neither names a .csv/.txt file nor an existing file (commas are valid in paths)
+    if not isinstance(source, str) :
+        return False
+    if '\n' in source :
+        return True
+    return ',' in source and not source.lower().endswith(('.csv', '.txt')) and not os.path.exists(source)
+
+def read_text(source, text=None) :
+    # The text of a decay table given as a path, a file object or the table itself
+    # (text always holds the table itself, whatever it looks like)
+    if text is not None :
+        return text
+    if hasattr(source, 'read') :
+        text = source.read()
+        return text.decode() if isinstance(text, bytes) else text
+    if isinstance(source, os.PathLike) :
+        source = os.fspath(source)
+    if type(source) != str :
+        raise TypeError('The decay table must be a file name, a file object or the table as a string.')
+    if is_table(source) :
+        return source
+    if not source.endswith(('.csv', '.txt')) :
+        raise Exception('The given file is not a CSV file. Please supply a CSV file.')
+    with open(source, newline='') as file :
+        return file.read()
+
+def _numbers(column, lines, label, integer, errors) :
+    # One column as floats, with a message added to errors for every value that is not a number
+    # (or not an integer); the whole column is converted at once and only searched when that fails
+    try :
+        values = np.array(column, dtype=float)
+    except ValueError :
+        values = np.zeros(len(column))
+        for i, value in enumerate(column) :
+            try :
+                values[i] = float(value)
+            except ValueError :
+                values[i] = np.nan
+    kind = 'an integer' if integer else 'a number'
+    bad = ~np.isfinite(values)
+    if integer :
+        bad |= values != np.round(values)
+    for i in np.flatnonzero(bad) :
+        errors.append('Line ' + str(lines[i]) + ': One of your ' + label + ' values (' + column[i].strip() + ') is not ' + kind + '.')
+    return values
+
+def parse_decay_table(source=None, text=None) :
+    '''
+    Goal: Parse a decay table of one or many isotopes in one columnar pass.
+
+    The table has the read_file columns (Decay, Isotope, Z, A, Spin, Parity,
+    Q, Branching Ratio), and every Start row begins a new isotope whose Beta
+    and EC rows follow it. Header rows (a first cell of Decay, or a first row
+    that is not a decay, as in .txt files) and blank lines are skipped. All
+    rows are split into string columns first and each column is checked and
+    converted as a whole, so one ValueError lists every problem in the table.
+
+    Parameters
+    -----------
+    source: str, path or file object
+            A .csv or .txt file name, an open file, or the table as a string
+            (a string with a line break, or with commas that is not a file).
+    text: str
+          The table as a string, never taken for a file name.
+
+    Returns
+    --------
+    table: dict
+           Columns of equal length: 'type' (0 Start, 1 Beta, 2 EC),
+           'isotope' (str), 'Z', 'A', 'spin', 'parity', 'Q' and 'branching'
+           (floats), and 'line' (the line of each row in the source).
+    '''
+
+    # Split every line, then drop blank lines and headers
+    rows = list(csv.reader(io.StringIO(read_text(source, text))))
+    kept = [i for i, row in enumerate(rows) if ''.join(row).strip() and row[0].strip().lower() != 'decay']
+    if kept and rows[kept[0]][0].strip().lower() not in DECAY_TYPES + ('electron capture',) :
+        kept = kept[1:]
+    lines = np.array(kept, dtype=int) + 1
+    rows = [rows[i] for i in kept]
+
+    errors = []
+    for i in np.flatnonzero(np.array([len(row) for row in rows], dtype=int) != len(COLUMNS)) :
+        errors.append('Line ' + str(lines[i]) + ': CSV file is not the right dimensions. Please make sure each row has a value for Decay Type, Isotope, Z, A, Spin, Parity, Q, and Branching Ratio.')
+    if errors :
+        _raise(errors)
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+
+    # Decay types
+    decay = np.char.lower(np.char.strip(np.array(columns[0], dtype=str)))
+    decay[decay == 'electron capture'] = 'ec'
+    types = np.full(len(decay), -1, dtype=np.int8)
+    for code, name in enumerate(DECAY_TYPES) :
+        types[decay == name] = code
+    for i in np.flatnonzero(types < 0) :
+        errors.append('Line ' + str(lines[i]) + ': Decay type (' + columns[0][i] + ') not written properly. Please either use Start, Beta, or EC.')
+    if len(types) and types[0] > 0 :
+        errors.append('Line ' + str(lines[0]) + ': The first decay path comes before any Start row.')
+
+    table = {'type': types, 'isotope': np.char.strip(np.array(columns[1], dtype=str)), 'line': lines}
+    for key, index, label, integer in (('Z', 2, 'Z', True), ('A', 3, 'A', True), ('spin', 4, 'spin', False),
+                                       ('parity', 5, 'parity', True), ('Q', 6, 'Q', False),
+                                       ('branching', 7, 'branching ratio', False)) :
+        table[key] = _numbers(columns[index], lines, label, integer, errors)
+
+    if errors :
+        _raise(errors)
+    return table
+
+##########################
+### Nuclide Database
+##########################
+
+class NuclideDB:
+    '''
+    Goal: An in-memory decay table of many isotopes, indexed by the name of
+    each starting isotope.
+
+    The table is parsed once (see parse_decay_table) and kept as columns;
+    looking an isotope up is a dictionary access, and its pathes are built
+    from its rows on first use and then kept.
+
+        db = NuclideDB('nuclides.csv')
+        start, beta_pathes, ec_pathes = db['Ir-192']
+
+    Parameters
+    -----------
+    source: str, path, file object or dict
+            The decay table (see parse_decay_table), or an already parsed one.
+    text: str
+          The decay table as a string, instead of source.
+    '''
+
+    def __init__(self, source=None, text=None):
+        self.table = source if isinstance(source, dict) else parse_decay_table(source, text)
+        starts = np.flatnonzero(self.table['type'] == 0)
+        stops = np.append(starts[1:], len(self.table['type']))
+
+        self.names = [str(name) for name in self.table['isotope'][starts]]
+        self._rows = {}
+        for name, first, stop in zip(self.names, starts, stops) :
+            if name.lower() in self._rows :
+                raise ValueError('Line ' + str(self.table['line'][first]) + ': The isotope ' + name + ' is already in the table.')
+            self._rows[name.lower()] = (first, stop)
+        self._pathes = {}
+
+    def __repr__(self):
+        return 'NuclideDB(' + str(len(self)) + ' isotopes)'
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name):
+        return str(name).lower() in self._rows
+
+    def __getitem__(self, name):
+        '''
+        Goal: The decay pathes of one isotope (the name is not case sensitive).
+
+        Returns
+        --------
+        start_iso, beta_pathes, ec_pathes, as returned by sins.sins.read_file.
+        '''
+
+        key = str(name).lower()
+        if key not in self._pathes :
+            if key not in self._rows :
+                raise KeyError('The isotope ' + str(name) + ' is not in the decay table.')
+            self._pathes[key] = self._build(*self._rows[key])
+        start, beta_pathes, ec_pathes = self._pathes[key]
+        return start, list(beta_pathes), list(ec_pathes)
+
+    def _build(self, first, stop):
+        # The read_file tuples of the rows first:stop (plain Python numbers, as read_file gives)
+        rows = slice(first, stop)
+        types = self.table['type'][rows]
+        names = self.table['isotope'][rows].tolist()
+        values = [self.table[key][rows].tolist() for key in ('Z', 'A', 'spin', 'parity', 'Q', 'branching')]
+        pathes = [(names[i], int(values[0][i]), int(values[1][i]), values[2][i], int(values[3][i]), values[4][i], values[5][i])
+                  for i in range(stop - first)]
+        beta_pathes = [pathes[i] for i in np.flatnonzero(types == 1)]
+        ec_pathes = [pathes[i][5:] for i in np.flatnonzero(types == 2)]
+        return pathes[0], beta_pathes, ec_pathes
+
+_databases = {}
+
+def as_database(database) :
+    '''
+    Goal: Turn the database argument of generate into a NuclideDB. A file
+    name is parsed once and kept until the file changes, so looking many
+    isotopes up in one file does not read it again.
+    '''
+
+    if database is None or isinstance(database, NuclideDB) :
+        return database
+    if hasattr(database, 'read') or isinstance(database, dict) or is_table(database) :
+        return NuclideDB(database)
+
+    path = os.path.abspath(os.fspath(database))
+    status = os.stat(path)
+    key = (path, status.st_mtime_ns, status.st_size)
+    if key not in _databases :
+        if len(_databases) >= DATABASE_CACHE_SIZE :
+            _databases.pop(next(iter(_databases)))
+        _databases[key] = NuclideDB(path)
+    return _databases[key]
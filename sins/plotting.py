@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import os
+
+import numpy as np
+
+from sins.instrument import count, timed, timer
+
+# matplotlib is imported inside the plotting functions, so that the compute
+# core (read_file, beta_decay_spectrum, ec_spectrum) never loads it
+
+MAX_PLOT_POINTS = 4000     # A max_points for dense spectra, where more points than the png shows add nothing
+
+##########################
+### Plotting
+##########################
+
+def downsample(energy, spectrum, max_points=MAX_PLOT_POINTS) :
+    '''
+    Goal: Thin a dense spectrum for drawing.
+
+    The points are split into max_points / 2 runs of equal length and the
+    smallest and largest value of each run are kept (with the first and last
+    point), so narrow lines and the endpoint look the same as with every point.
+
+    Returns
+    --------
+    energy: array
+    spectrum: array
+    '''
+
+    energy = np.asarray(energy, dtype=float)
+    spectrum = np.asarray(spectrum, dtype=float)
+    if max_points is None or len(energy) <= max_points :
+        return energy, spectrum
+
+    runs = max(max_points // 2, 1)
+    size = -(-len(energy) // runs)
+    padding = runs * size - len(energy)
+    offsets = np.arange(runs) * size
+    low = np.argmin(np.append(spectrum, np.full(padding, np.inf)).reshape(runs, size), axis=1) + offsets
+    high = np.argmax(np.append(spectrum, np.full(padding, -np.inf)).reshape(runs, size), axis=1) + offsets
+    keep = np.unique(np.concatenate([[0, len(energy) - 1], np.minimum(low, len(energy) - 1), np.minimum(high, len(energy) - 1)]))
+    return energy[keep], spectrum[keep]
+
+def render(energy, spectrum, particle, iso_name, file_name=None, max_points=None) :
+    '''
+    Goal: Draw a spectrum into a png file.
+
+    A new matplotlib Figure is drawn with the Agg canvas, without pyplot, so
+    nothing is shown, no global figure is shared between plots and the figure
+    is freed as soon as it is saved.
+
+    Parameters
+    -----------
+    energy: list
+            The energies associated with the provided spectra.
+    spectrum: list
+              The number of particle per keV per decay.
+    particle: str
+              The particle being shown in the spectrum.
+    iso_name: str
+              Name of the isotope of interest.
+    file_name: str
+               The png file. Defaults to <iso_name>_<particle>_Spectrum.png.
+    max_points: int
+                Spectra with more points are downsampled (see downsample).
+                None (the default) draws every point.
+
+    Returns
+    --------
+    file_name: str
+    '''
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if file_name is None :
+        file_name = iso_name + '_' + particle + '_Spectrum.png'
+    energy, spectrum = downsample(energy, spectrum, max_points)
+
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot(1, 1, 1)
+    axes.plot(energy, spectrum, color='black')
+    axes.set_ylabel('dN/dE (' + particle + 's/keV/Decay)')
+    axes.set_xlabel(particle + ' Energy (keV)')
+    axes.set_title(iso_name + ' ' + particle + ' Spectrum')
+    figure.savefig(file_name)
+    figure.clear()
+    return file_name
+
+@timed('plot')
+def plot(energy, spectrum, particle, iso_name, max_points=None) :
+    '''
+    Goal: Plot Spectra
+
+    Parameters
+    -----------
+    energy: list
+            The energies associated with the provided spectra.
+    spectrum: list
+              The number of particle per keV per decay.
+    particle: str
+              The particle being shown in the spectrum.
+    iso_name: str
+              Name of the isotope of interest.
+    max_points: int
+                Spectra with more points are downsampled before drawing, e.g.
+                MAX_PLOT_POINTS (see downsample). None draws every point.
+    '''
+
+    file_name = render(energy, spectrum, particle, iso_name, max_points=max_points)
+    count('bytes written', os.path.getsize(file_name))
+    print('File Created: ' + file_name)
+
+def _render_job(job, max_points=None) :
+    # render one (energy, spectrum, particle, iso_name[, file_name]) job
+    return render(*job, max_points=max_points)
+
+def render_many(jobs, workers=None, max_points=None) :
+    '''
+    Goal: Render many spectra into png files across a pool of worker processes.
+
+    Parameters
+    -----------
+    jobs: list
+          (energy, spectrum, particle, iso_name) tuples, optionally with a
+          file name as a fifth entry (see render).
+    workers: int
+             The number of worker processes. Defaults to the number of CPUs;
+             1 renders every plot in this process.
+    max_points: int
+                Spectra with more points are downsampled (see render).
+
+    Returns
+    --------
+    file_names: list
+                The png file of each job, in input order.
+    '''
+
+    jobs = [tuple(job) for job in jobs]
+    if workers is None :
+        workers = os.cpu_count() or 1
+
+    with timer('render_many') :
+        if workers == 1 or len(jobs) <= 1 :
+            file_names = [_render_job(job, max_points) for job in jobs]
+        else :
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor :
+                file_names = list(executor.map(_render_job, jobs, [max_points] * len(jobs)))
+
+    for file_name in file_names :
+        count('bytes written', os.path.getsize(file_name))
+        print('File Created: ' + file_name)
+    return file_names
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+from collections import OrderedDict
+
+import numpy as np
+from scipy.constants import physical_constants
+from scipy.special import ndtr
+
+from sins.grid import trapezoid_weights
+from sins.spectrum import Spectrum
+
+N_SIGMA = 6                # Gaussian smearing is truncated this many standard deviations from its centre
+MATRIX_CACHE_SIZE = 8      # Response matrices (one per input grid) kept by each Response
+
+### Cross Section Constants
+IBD_THRESHOLD = 1806.      # Inverse beta decay threshold (keV)
+IBD_DELTA = 1293.3         # Neutron - proton mass difference (keV)
+IBD_SIGMA0 = 0.0952e-42    # Zeroth order IBD cross section coefficient (cm² per MeV²)
+G_F = physical_constants['Fermi coupling constant'][0]           # GeV^-2
+HBAR_C = physical_constants['reduced Planck constant times c in MeV fm'][0] * 1e-16      # GeV cm
+SIN2_θW = physical_constants['weak mixing angle'][0]
+
+##########################
+### Cross Sections
+##########################
+
+def ibd_cross_section(energies) :
+    # Inverse beta decay (antineutrino on a proton) cross section in cm² at neutrino energies in keV,
+    # at zeroth order in 1/M (Vogel & Beacom 1999); zero below the 1.806 MeV threshold
+    energies = np.asarray(energies, dtype=float)
+    E_e = np.maximum(energies - IBD_DELTA, 0) / 1000          # positron total energy (MeV)
+    p_e = np.sqrt(np.clip(E_e**2 - (510.9989461 / 1000)**2, 0, None))
+    return np.where(energies >= IBD_THRESHOLD, IBD_SIGMA0 * E_e * p_e, 0.)
+
+def cevns_cross_section(energies, Z, N) :
+    # Coherent elastic neutrino-nucleus scattering cross section in cm² at neutrino energies in keV,
+    # for a nucleus with Z protons and N neutrons (full coherence, no form factor)
+    # Use e.g. functools.partial(cevns_cross_section, Z=32, N=41) as a Response cross section
+    energies = np.asarray(energies, dtype=float) / 1e6        # GeV
+    Q_W = N - (1 - 4 * SIN2_θW) * Z
+    return G_F**2 * Q_W**2 * energies**2 / (4 * np.pi) * HBAR_C**2
+
+##########################
+### Response Folding
+##########################
+
+class Response:
+    '''
+    Goal: Fold spectra with a cross section and a Gaussian energy resolution.
+
+    Every input spectrum is first weighted by the cross section at its own
+    energies. With a constant resolution (a number, in keV) the weighted
+    spectrum is deposited onto the uniform output grid without changing its
+    integral and convolved with the Gaussian by FFT. With an energy-dependent
+    resolution (a function of energy) a sparse response matrix is built,
+    whose columns are the probabilities of each output bin for one input
+    energy times the input's quadrature weight and cross section; it is cached
+    per input grid, so folding a whole library is one sparse matrix product.
+    Counts smeared outside the output energies are lost.
+
+    Parameters
+    -----------
+    energies: array
+              The output (reconstructed) energies in keV, in increasing order.
+              They must be evenly spaced for a constant resolution.
+    resolution: float or callable
+                The Gaussian standard deviation in keV, or a function giving
+                it at an array of energies. None only applies the cross
+                section and rebins.
+    cross_section: callable
+                   A function giving the cross section at an array of
+                   energies in keV (e.g. ibd_cross_section). None is 1.
+    n_sigma: float
+             Where the Gaussian is truncated.
+    '''
+
+    def __init__(self, energies, resolution=None, cross_section=None, n_sigma=N_SIGMA):
+        self.energies = np.asarray(energies, dtype=float)
+        if self.energies.ndim != 1 or len(self.energies) < 2 or (np.diff(self.energies) <= 0).any() :
+            raise ValueError('The output energies must be at least 2 increasing values.')
+        self.resolution = resolution
+        self.cross_section = cross_section
+        self.n_sigma = n_sigma
+        self.widths = trapezoid_weights(self.energies)
+        self.edges = np.concatenate([[self.energies[0] - self.widths[0]],
+                                     (self.energies[1:] + self.energies[:-1]) / 2,
+                                     [self.energies[-1] + self.widths[-1]]])
+
+        self.step = None
+        if resolution is None or not callable(resolution) :
+            steps = np.diff(self.energies)
+            if not np.allclose(steps, steps[0], rtol=1e-9, atol=0) :
+                raise ValueError('A constant resolution needs evenly spaced output energies.')
+            self.step = steps[0]
+        self._matrices = OrderedDict()
+
+    def __repr__(self):
+        return 'Response(' + str(len(self.energies)) + ' energies, resolution=' + repr(self.resolution) + ')'
+
+    def weights(self, energies):
+        # Counts per point of a spectrum on these energies: quadrature weight times cross section
+        weights = trapezoid_weights(energies)
+        if self.cross_section is not None :
+            weights = weights * self.cross_section(energies)
+        return weights
+
+    def matrix(self, energies):
+        '''
+        Goal: The sparse (output x input) response matrix for spectra on the
+        given energies, built on first use and then cached.
+        '''
+
+        energies = np.ascontiguousarray(energies, dtype=float)
+        key = energies.tobytes()
+        if key in self._matrices :
+            self._matrices.move_to_end(key)
+            return self._matrices[key]
+
+        from scipy.sparse import csr_matrix
+        if callable(self.resolution) :
+            sigma = np.maximum(np.broadcast_to(self.resolution(energies), energies.shape), 1e-12)
+        else :
+            sigma = np.full(energies.shape, 1e-12 if self.resolution is None else float(self.resolution))
+
+        # Output bins within n_sigma of each input energy
+        n_out = len(self.energies)
+        low = np.clip(np.searchsorted(self.edges, energies - self.n_sigma * sigma, side='right') - 1, 0, n_out)
+        high = np.clip(np.searchsorted(self.edges, energies + self.n_sigma * sigma, side='left'), 0, n_out)
+        counts = np.maximum(high - low, 0)
+        columns = np.repeat(np.arange(len(energies)), counts)
+        rows = np.repeat(low, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        centre, width = energies[columns], sigma[columns]
+        probability = ndtr((self.edges[rows + 1] - centre) / width) - ndtr((self.edges[rows] - centre) / width)
+        values = probability * self.weights(energies)[columns] / self.widths[rows]
+        matrix = csr_matrix((values, (rows, columns)), shape=(n_out, len(energies)))
+
+        self._matrices[key] = matrix
+        if len(self._matrices) > MATRIX_CACHE_SIZE :
+            self._matrices.popitem(last=False)
+        return matrix
+
+    def _deposit(self, energies, values):
+        # Spectra (rows of values) moved onto the evenly spaced output energies with their integrals kept:
+        # each point's counts are split linearly between its two neighbouring output points
+        counts = values * self.weights(energies)
+        position = (energies - self.energies[0]) / self.step
+        index = np.floor(position).astype(int)
+        fraction = position - index
+        n_out = len(self.energies)
+
+        deposited = np.zeros(values.shape[:-1] + (n_out,))
+        for target, share in ((index, 1 - fraction), (index + 1, fraction)) :
+            inside = (target >= 0) & (target < n_out)
+            np.add.at(deposited, (..., target[inside]), counts[..., inside] * share[inside])
+        return deposited / self.widths
+
+    def _convolve(self, density):
+        # FFT convolution of each row with the bin-integrated Gaussian (same length output)
+        from scipy.fft import irfft, next_fast_len, rfft
+        half = int(np.ceil(self.n_sigma * self.resolution / self.step))
+        offsets = np.arange(-half, half + 1) * self.step
+        kernel = ndtr((offsets + self.step / 2) / self.resolution) - ndtr((offsets - self.step / 2) / self.resolution)
+
+        size = next_fast_len(density.shape[-1] + len(kernel) - 1, real=True)
+        full = irfft(rfft(density, size, axis=-1) * rfft(kernel, size), size, axis=-1)
+        return full[..., half:half + density.shape[-1]]
+
+    def fold(self, energies, values):
+        '''
+        Goal: Fold one spectrum, or many on the same energies.
+
+        Parameters
+        -----------
+        energies: array
+                  The energies (in keV) of the input spectra.
+        values: array
+                One spectrum, or a (spectra, energies) array of them (per keV).
+
+        Returns
+        --------
+        folded: array
+                The folded spectra on the output energies (per keV, times the
+                cross section units), with the same leading shape as values.
+        '''
+
+        energies = np.asarray(energies, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if callable(self.resolution) :
+            return (self.matrix(energies) @ values.T).T
+
+        density = self._deposit(energies, values)
+        if self.resolution is None or self.resolution <= 0 :
+            return density
+        return self._convolve(density)
+
+    def fold_outputs(self, outputs):
+        '''
+        Goal: Fold the neutrino spectrum of one generate result, or of a list
+        of them (a whole isotope library) in one call.
+
+        Returns
+        --------
+        folded: array
+                The folded neutrino spectrum, or a (results, energies) array.
+        '''
+
+        if isinstance(outputs, tuple) :
+            return self.fold(outputs[0], outputs[1])
+
+        spectra = [Spectrum(output[0], output[1]) for output in outputs]
+        energies = Spectrum.union(spectra)
+        return self.fold(energies, np.vstack([spectrum.at(energies) for spectrum in spectra]))
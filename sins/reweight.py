@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import numpy as np
+
+from sins.beta import run_pathes
+from sins.grid import as_grid
+from sins.spectrum import Spectrum
+
+##########################
+### Reweightable Spectra
+##########################
+
+class PathSpectra:
+    '''
+    Goal: Keep the unit-normalized spectrum of every beta path, so the total
+    spectra can be rebuilt for new branching ratios without recomputing them.
+
+    The shape of a path depends only on its daughter (Z, A), spin change and
+    Q value; the branching ratio is just its scale. The unit shapes are
+    interpolated once onto the total energy grid and stored as the columns of
+    an (energies x pathes) matrix, so a new set of branching ratios costs one
+    matrix-vector product, and many sets one matrix product. Changing the Q
+    value of some pathes (with_q) recomputes only those pathes.
+
+    spectrum() with the original branching ratios gives the same spectra as
+    beta_decay_spectrum (up to rounding). Electron capture lines are not
+    included; they cost nothing to regenerate.
+
+    Parameters
+    -----------
+    start: tuple
+           The information about the initial isotope. Follows the format (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+    beta_pathes: list
+                 All of the decay paths that are via beta.
+    tables: bool
+            True to interpolate the Coulomb amplitudes from cached Fermi tables.
+    grid: EnergyGrid, float, str or dict
+          The energy grid for each path (see sins.grid.as_grid).
+    workers: int
+             Evaluate the paths concurrently in a pool of this many threads.
+    executor: concurrent.futures.Executor
+              An existing pool to evaluate the paths in.
+    shapes: list
+            Already computed (beta, nu) unit Spectrum pairs, one per path
+            (None entries are computed).
+    '''
+
+    def __init__(self, start, beta_pathes, tables=False, grid=None, workers=None, executor=None, shapes=None):
+        self.start = start
+        self.beta_pathes = list(beta_pathes)
+        self.tables = tables
+        self.grid = as_grid(grid)
+        self.workers = workers
+        self.executor = executor
+        self.branching = np.array([path[6] for path in self.beta_pathes], dtype=float)
+
+        # Compute the missing unit shapes (every path with a branching ratio of 1)
+        shapes = list(shapes) if shapes is not None else [None] * len(self.beta_pathes)
+        missing = [i for i, shape in enumerate(shapes) if shape is None]
+        unit_pathes = [tuple(self.beta_pathes[i][:6]) + (1.,) for i in missing]
+        for i, (beta, nu, energies) in zip(missing, run_pathes(start, unit_pathes, tables, workers, executor, self.grid)) :
+            shapes[i] = (Spectrum(energies, beta), Spectrum(energies, nu))
+        self.shapes = shapes
+
+        self._build()
+
+    def __repr__(self):
+        return 'PathSpectra(' + str(self.start[0]) + ', ' + str(len(self.beta_pathes)) + ' pathes)'
+
+    def _build(self):
+        # The total grid and the unit shapes interpolated onto it, as beta_decay_spectrum sums them
+        beta = [shape[0] for shape in self.shapes]
+        nu = [shape[1] for shape in self.shapes]
+        end = max(spectrum.energies[-1] for spectrum in nu)
+        if self.grid is not None :
+            nu = [spectrum.closed() if spectrum.energies[-1] < end else spectrum for spectrum in nu]
+
+        self.energies = Spectrum.union(nu)
+        beta_energies = Spectrum.union(beta)
+        self.nu_matrix = np.column_stack([spectrum.at(self.energies) for spectrum in nu])
+        self.beta_matrix = np.column_stack([np.interp(self.energies, beta_energies, spectrum.at(beta_energies), left=0, right=0)
+                                            for spectrum in beta])
+
+    def spectrum(self, branching=None):
+        '''
+        Goal: Build the total spectra for a set of branching ratios.
+
+        Parameters
+        -----------
+        branching: array
+                   One branching ratio per path (defaults to those of the
+                   pathes).
+
+        Returns
+        --------
+        energies: array
+                  The energies (in keV) of both spectra.
+        total_beta: Spectrum
+                    The beta spectrum (per keV per decay).
+        total_nu: Spectrum
+                  The neutrino spectrum (per keV per decay).
+        '''
+
+        branching = self.branching if branching is None else self._check(branching)
+        return self.energies, Spectrum(self.energies, self.beta_matrix @ branching), \
+               Spectrum(self.energies, self.nu_matrix @ branching)
+
+    def spectra(self, branching):
+        '''
+        Goal: Build the total spectra for many sets of branching ratios at once.
+
+        Parameters
+        -----------
+        branching: array
+                   A (sets, pathes) array of branching ratios.
+
+        Returns
+        --------
+        energies: array
+                  The energies (in keV) of the spectra.
+        total_beta: array
+                    A (sets, energies) array of beta spectra.
+        total_nu: array
+                  A (sets, energies) array of neutrino spectra.
+        '''
+
+        branching = np.atleast_2d(self._check(branching))
+        return self.energies, branching @ self.beta_matrix.T, branching @ self.nu_matrix.T
+
+    def with_q(self, q_values):
+        '''
+        Goal: The same pathes with some Q values changed. Only the changed
+        pathes are recomputed, with the workers or executor of this instance.
+
+        Parameters
+        -----------
+        q_values: dict
+                  Path index -> new Q value (in keV).
+
+        Returns
+        --------
+        path_spectra: PathSpectra
+        '''
+
+        beta_pathes = list(self.beta_pathes)
+        shapes = list(self.shapes)
+        for i, Q in q_values.items() :
+            if beta_pathes[i][5] != Q :
+                beta_pathes[i] = tuple(beta_pathes[i][:5]) + (Q,) + tuple(beta_pathes[i][6:])
+                shapes[i] = None
+        return PathSpectra(self.start, beta_pathes, self.tables, self.grid, self.workers, self.executor, shapes)
+
+    def _check(self, branching):
+        branching = np.asarray(branching, dtype=float)
+        if branching.shape[-1] != len(self.beta_pathes) :
+            raise ValueError('Please give one branching ratio for each of the ' + str(len(self.beta_pathes)) + ' pathes.')
+        return branching
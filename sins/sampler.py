@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import numpy as np
+
+from sins.beta import beta_decay_spectrum
+from sins.sins import read_file
+
+CHUNK_SIZE = 1000000       # Default number of samples per chunk when streaming
+
+##########################
+### Energy Sampler
+##########################
+
+def alias_table(weights) :
+    '''
+    Goal: Build Vose's alias table for drawing indices with the given weights.
+
+    Returns
+    --------
+    probability: array
+                 Probability of keeping each drawn index.
+    alias: array
+           The index used instead when it is not kept.
+    '''
+
+    weights = np.asarray(weights, dtype=float)
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+    probability = np.ones(n)
+    alias = np.arange(n)
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large :
+        i, j = small.pop(), large.pop()
+        probability[i] = scaled[i]
+        alias[i] = j
+        scaled[j] -= 1 - scaled[i]
+        (small if scaled[j] < 1 else large).append(j)
+    return probability, alias
+
+class Sampler:
+    '''
+    Goal: Draw particle energies from a spectrum made of a continuum and
+    discrete lines.
+
+    The continuum is the piecewise-linear spectrum through (energies, values),
+    the same one the trapezoid normalization integrates. Its cumulative
+    distribution is tabulated once, and each sample is found with a binary
+    search in that table followed by the exact inversion of the quadratic
+    CDF inside its bin. The lines (electron capture neutrinos) and the
+    continuum as a whole are picked with an alias table, in proportion to
+    their branching ratios and the integral of the continuum. Every draw is a
+    vectorized batch from a numpy.random.Generator.
+
+    Parameters
+    -----------
+    energies: array
+              The energies (in keV) of the continuum, in increasing order.
+    values: array
+            The continuum (per keV per decay).
+    lines: array
+           The energies (in keV) of the lines.
+    ratios: array
+            The branching ratio of each line.
+    '''
+
+    def __init__(self, energies=None, values=None, lines=(), ratios=()):
+        self.lines = np.asarray(lines, dtype=float)
+        ratios = np.asarray(ratios, dtype=float)
+        if self.lines.shape != ratios.shape :
+            raise ValueError('Please give one branching ratio for each line.')
+
+        # Cumulative table of the continuum
+        self.energies = np.asarray(energies if energies is not None else [], dtype=float)
+        self.values = np.clip(np.asarray(values if values is not None else [], dtype=float), 0, None)
+        if len(self.energies) > 1 :
+            masses = np.diff(self.energies) * (self.values[1:] + self.values[:-1]) / 2
+            self.cumulative = np.concatenate([[0.], np.cumsum(masses)])
+            self.slopes = np.diff(self.values) / np.diff(self.energies)
+            continuum = self.cumulative[-1]
+        else :
+            continuum = 0.
+
+        # Alias table over the lines and, as the last entry, the continuum
+        weights = np.append(ratios, continuum)
+        if weights.sum() <= 0 :
+            raise ValueError('There is nothing to sample: the spectrum and the lines are all zero.')
+        self.weights = weights
+        self.probability, self.alias = alias_table(weights)
+
+    def __repr__(self):
+        return 'Sampler(' + str(len(self.energies)) + ' continuum points, ' + str(len(self.lines)) + ' lines)'
+
+    @classmethod
+    def from_file(cls, file_name, particle='Neutrino', grid=None, tables=False):
+        '''
+        Goal: Build the sampler of an isotope csv file (see read_file).
+
+        The neutrino sampler uses the beta continuum and the exact electron
+        capture lines (instead of the binned lines of ec_spectrum); the beta
+        sampler uses the beta continuum.
+
+        Parameters
+        -----------
+        file_name: str
+                   The csv file with the decay paths.
+        particle: str
+                  Neutrino or Beta.
+        grid: EnergyGrid, float, str or dict
+              The energy grid of the continuum (see sins.grid.as_grid).
+        tables: bool
+                True to interpolate the Coulomb amplitudes from Fermi tables.
+        '''
+
+        if particle.lower() not in ('neutrino', 'beta') :
+            raise ValueError('Unknown particle (' + particle + '). Please use Neutrino or Beta.')
+        start, beta_pathes, ec_pathes = read_file(file_name)
+
+        energies = values = None
+        if beta_pathes != [] :
+            energies, total_beta, total_nu = beta_decay_spectrum(start, beta_pathes, tables=tables, grid=grid)
+            values = total_nu.values if particle.lower() == 'neutrino' else total_beta.values
+        if particle.lower() == 'beta' or ec_pathes == [] :
+            return cls(energies, values)
+        return cls(energies, values, [path[0] for path in ec_pathes], [path[1] for path in ec_pathes])
+
+    def _continuum(self, u):
+        # Continuum energies at the cumulative fractions u (exact inverse of the piecewise-linear CDF)
+        mass = u * self.cumulative[-1]
+        index = np.clip(np.searchsorted(self.cumulative, mass, side='right') - 1, 0, len(self.energies) - 2)
+        mass -= self.cumulative[index]
+        f0 = self.values[index]
+        slope = self.slopes[index]
+
+        # Solve f0 x + slope x²/2 = mass for the offset x inside the bin
+        root = f0 + np.sqrt(np.clip(f0**2 + 2 * slope * mass, 0, None))
+        offset = np.divide(2 * mass, root, out=np.zeros(len(mass)), where=root > 0)
+        return self.energies[index] + np.minimum(offset, self.energies[index + 1] - self.energies[index])
+
+    def sample(self, size, rng=None):
+        '''
+        Goal: Draw a batch of energies.
+
+        Parameters
+        -----------
+        size: int
+              The number of energies.
+        rng: numpy.random.Generator or int
+             The random generator, or a seed for a new one.
+
+        Returns
+        --------
+        energies: array
+                  The sampled energies (in keV).
+        '''
+
+        rng = np.random.default_rng(rng)
+        n = len(self.weights)
+        if n == 1 :
+            return self._continuum(rng.random(size))
+
+        category = rng.integers(n, size=size)
+        category = np.where(rng.random(size) < self.probability[category], category, self.alias[category])
+        samples = np.empty(size)
+        continuum = category == n - 1
+        samples[~continuum] = self.lines[category[~continuum]]
+        if continuum.any() :
+            samples[continuum] = self._continuum(rng.random(np.count_nonzero(continuum)))
+        return samples
+
+    def stream(self, total, chunk_size=CHUNK_SIZE, rng=None):
+        '''
+        Goal: Draw total energies in chunks of at most chunk_size, so memory
+        stays bounded however many are needed.
+
+            for chunk in sampler.stream(10**8, rng=1) :
+                simulate(chunk)
+        '''
+
+        rng = np.random.default_rng(rng)
+        while total > 0 :
+            size = min(chunk_size, total)
+            yield self.sample(size, rng)
+            total -= size
+
+    def mean(self):
+        # Mean energy of the sampled distribution in keV
+        mean = np.dot(self.weights[:-1], self.lines)
+        if len(self.energies) > 1 :
+            # Exact mean of the piecewise-linear continuum
+            E0, E1 = self.energies[:-1], self.energies[1:]
+            f0, f1 = self.values[:-1], self.values[1:]
+            mean += np.sum((E1 - E0) * (f0 * (2 * E0 + E1) + f1 * (E0 + 2 * E1)) / 6)
+        return mean / self.weights.sum()
@@ -0,0 +1,421 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import argparse
+import asyncio
+import json
+import os
+import stat
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from sins.beta import beta_decay_spectrum
+from sins.cache import as_cache
+from sins.ec import ec_spectrum
+from sins.grid import as_grid
+from sins.nuclides import as_database
+from sins.sins import cached_spectra, read_file
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+SERVER_CACHE_BYTES = 256 * 1024**2     # Spectra kept in memory by a server (256 MB)
+SERVER_TABLES = 256                     # Parsed decay table files kept in memory by a server
+STREAM_BLOCK = 1024**2                  # Bytes written to a connection before waiting for the client to read them
+MAX_BODY = 1024**2                      # Largest request body accepted
+ARRAYS_TYPE = 'application/x-sins-arrays'
+FUNCTIONS = ('read_file', 'beta_decay_spectrum', 'ec_spectrum', 'generate')
+PARAMETERS = ('file', 'isotope', 'database', 'grid', 'tables')
+OUTPUT_NAMES = {2: ('energy', 'neutrino'), 3: ('energy', 'neutrino', 'beta'),
+                4: ('energy', 'neutrino', 'beta_energies', 'beta')}
+REASONS = {200: 'OK', 400: 'Bad Request', 403: 'Forbidden', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           415: 'Unsupported Media Type', 500: 'Internal Server Error'}
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1')     # Host headers always accepted (with any port)
+
+##########################
+### Binary Arrays
+##########################
+
+def array_chunks(names, arrays, info=None, block=STREAM_BLOCK) :
+    '''
+    Goal: The body of an arrays response, as byte chunks of at most block bytes.
+
+    The body is the length of a JSON header (8 bytes, little-endian), the
+    header ({'names', 'lengths', 'dtype', 'info'}) and then every array as
+    little-endian float64, back to back. The arrays are sliced rather than
+    copied, so a large spectrum is never held twice.
+
+    Returns
+    --------
+    size: int
+          The length of the body in bytes.
+    chunks: generator
+    '''
+
+    arrays = [np.ascontiguousarray(array, dtype='<f8') for array in arrays]
+    header = json.dumps({'names': list(names), 'lengths': [len(array) for array in arrays],
+                         'dtype': '<f8', 'info': info or {}}).encode()
+    size = 8 + len(header) + sum(array.nbytes for array in arrays)
+
+    def chunks() :
+        yield struct.pack('<Q', len(header)) + header
+        for array in arrays :
+            data = memoryview(array).cast('B')
+            for first in range(0, len(data), block) :
+                yield data[first:first + block]
+    return size, chunks()
+
+##########################
+### Spectrum Server
+##########################
+
+class SpectrumServer:
+    '''
+    Goal: Serve read_file, beta_decay_spectrum, ec_spectrum and generate to
+    many short scripts from one long-running process, so they do not each
+    import sins, parse their decay tables and compute their spectra again.
+
+    The server speaks HTTP/1.1 over a local TCP port or a Unix socket: POST
+    /<function> with a JSON object of parameters (file, or isotope and
+    database; grid; tables for beta_decay_spectrum), GET /stats for the
+    counters. read_file answers JSON, the other functions binary arrays (see
+    array_chunks), streamed in blocks as the client reads them.
+
+    Parsed decay tables are kept until their file changes, in a least
+    recently used cache of max_tables files, and results are kept in a least
+    recently used cache of max_bytes. The functions run in a
+    pool of worker threads, outside the event loop; a request identical to
+    one already being computed waits for that computation instead of
+    starting its own. There is no authentication, so only serve on
+    localhost or a socket that only trusted users can open. Requests must
+    name a local Host (or the address the server listens on), which stops
+    web pages from reaching it through DNS rebinding, and POST their
+    parameters as application/json, which a page cannot send to another
+    site without the server's consent.
+
+        server = SpectrumServer()
+        server.run(path='/tmp/sins.sock')      # or python -m sins.server --socket /tmp/sins.sock
+
+    Parameters
+    -----------
+    workers: int
+             Worker threads for the computations (default: number of CPUs).
+    max_bytes: int
+               Size limit of the in-memory result cache.
+    cache: str or ResultCache
+           An on-disk result cache used by generate (see sins.sins.generate).
+    max_tables: int
+                Number of parsed decay table files kept in memory.
+    '''
+
+    def __init__(self, workers=None, max_bytes=SERVER_CACHE_BYTES, cache=None, max_tables=SERVER_TABLES):
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.max_bytes = max_bytes
+        self.max_tables = max_tables
+        self.cache = as_cache(cache)
+        self.address = None
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0}
+        self._results = OrderedDict()       # key -> (result, bytes)
+        self._bytes = 0
+        self._pending = {}                  # key -> future of the computation in progress
+        self._tables = OrderedDict()        # file -> (file key, parsed decay table), least recently used first
+        self._tables_lock = threading.Lock()    # worker threads parse each file once
+        self._server = None
+        self._writers = set()
+        self._loop = None
+        self._thread = None
+
+    def __repr__(self):
+        return 'SpectrumServer(' + repr(self.address) + ')'
+
+    ### Computations
+
+    def _source(self, params):
+        # The key of the decay table a request names, which changes whenever its file does
+        for key in params :
+            if key not in PARAMETERS :
+                raise ValueError('Unknown parameter (' + key + '). Please use ' + ', '.join(PARAMETERS) + '.')
+        if params.get('database') is not None :
+            if params.get('isotope') is None :
+                raise ValueError('Please give the isotope to look up in the database.')
+            path = os.path.abspath(params['database'])
+            status = os.stat(path)
+            return ('database', path, status.st_mtime_ns, status.st_size, str(params['isotope']).lower())
+        if params.get('file') is None :
+            raise ValueError('Please give a file, or an isotope and a database.')
+        path = os.path.abspath(params['file'])
+        status = os.stat(path)
+        return ('file', path, status.st_mtime_ns, status.st_size)
+
+    def _decay_table(self, source, params):
+        # start, beta_pathes and ec_pathes of a source, parsed once per version of its file
+        if source[0] == 'database' :
+            return as_database(source[1])[params['isotope']]
+        path = source[1]
+        with self._tables_lock :
+            if path not in self._tables or self._tables[path][0] != source :
+                self._tables[path] = (source, read_file(path))
+                while len(self._tables) > self.max_tables :
+                    self._tables.popitem(last=False)
+            self._tables.move_to_end(path)
+            start, beta_pathes, ec_pathes = self._tables[path][1]
+        return start, list(beta_pathes), list(ec_pathes)
+
+    def _compute(self, function, source, params):
+        # Run one function in a worker thread; the result is ('json', value) or ('arrays', names, arrays)
+        start, beta_pathes, ec_pathes = self._decay_table(source, params)
+        grid = as_grid(params.get('grid'))
+        if function == 'read_file' :
+            return ('json', {'start': list(start), 'beta_pathes': [list(path) for path in beta_pathes],
+                             'ec_pathes': [list(path) for path in ec_pathes]})
+        if function == 'beta_decay_spectrum' :
+            if beta_pathes == [] :
+                raise ValueError('The isotope ' + str(start[0]) + ' has no beta decay pathes.')
+            energies, total_beta, total_nu = beta_decay_spectrum(start, beta_pathes, tables=bool(params.get('tables', False)), grid=grid)
+            return ('arrays', ('energies', 'beta', 'nu'), [energies, total_beta, total_nu])
+        if function == 'ec_spectrum' :
+            if ec_pathes == [] :
+                raise ValueError('The isotope ' + str(start[0]) + ' has no electron capture pathes.')
+            energies, nu_spectrum = ec_spectrum(ec_pathes, grid)
+            return ('arrays', ('energies', 'nu'), [energies, nu_spectrum])
+        outputs = cached_spectra(start, beta_pathes, ec_pathes, grid, self.cache)
+        return ('arrays', OUTPUT_NAMES[len(outputs)], list(outputs))
+
+    async def call(self, function, params):
+        '''
+        Goal: The result of one function, from the cache, from an identical
+        computation in progress, or computed in a worker thread.
+
+        Returns
+        --------
+        result: tuple
+                ('json', value) or ('arrays', names, arrays).
+        cached: bool
+                True when no computation was started for this request.
+        '''
+
+        if function not in FUNCTIONS :
+            raise KeyError(function)
+        source = self._source(params)
+        grid = as_grid(params.get('grid'))
+        tables = bool(params.get('tables', False)) if function == 'beta_decay_spectrum' else False
+        key = (function, source, repr(grid), tables)
+
+        if key in self._results :
+            self._results.move_to_end(key)
+            self.stats['hits'] += 1
+            return self._results[key][0], True
+        if key in self._pending :
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self._pending[key]), True
+
+        self.stats['misses'] += 1
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self._compute, function, source, params)
+        self._pending[key] = future
+        try :
+            result = await asyncio.shield(future)
+        finally :
+            del self._pending[key]
+        self._store(key, result)
+        return result, False
+
+    def _store(self, key, result):
+        # Keep a result, dropping the least recently used ones beyond max_bytes
+        size = sum(np.asarray(array).nbytes for array in result[2]) if result[0] == 'arrays' else len(json.dumps(result[1]))
+        if size > self.max_bytes :
+            return
+        self._results[key] = (result, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes :
+            _, (_, dropped) = self._results.popitem(last=False)
+            self._bytes -= dropped
+
+    def summary(self):
+        # The counters of GET /stats
+        return dict(self.stats, entries=len(self._results), bytes=self._bytes, tables=len(self._tables),
+                    pending=len(self._pending))
+
+    ### HTTP
+
+    def _allowed_host(self, host):
+        # True for a Host header naming this machine or the address the server listens on
+        if host.startswith('[') :
+            host = host[1:].partition(']')[0]
+        elif host.count(':') == 1 :
+            host = host.partition(':')[0]
+        host = host.lower()
+        return host in LOCAL_HOSTS or (self.address is not None and host == self.address.rpartition(':')[0].lower())
+
+    async def _respond(self, method, target, body, headers=None):
+        # (status, content type, size, chunks) of one request
+        headers = headers or {}
+        if not self._allowed_host(headers.get('host', '')) :
+            return _json_response(403, {'error': 'Unknown Host (' + headers.get('host', '') + '). Please call the server as localhost.'})
+        if method == 'POST' and headers.get('content-type', '').partition(';')[0].strip().lower() != 'application/json' :
+            return _json_response(415, {'error': 'Please POST the parameters as application/json.'})
+        function = urlsplit(target).path.strip('/')
+        if function == 'stats' and method in ('GET', 'POST') :
+            return _json_response(200, self.summary())
+        if function not in FUNCTIONS :
+            return _json_response(404, {'error': 'Unknown function (' + function + '). Please use ' + ', '.join(FUNCTIONS) + ' or stats.'})
+        if method != 'POST' :
+            return _json_response(405, {'error': 'Please POST a JSON object of parameters to /' + function + '.'})
+
+        self.stats['requests'] += 1
+        try :
+            params = json.loads(body or b'{}')
+            if not isinstance(params, dict) :
+                raise ValueError('The parameters must be a JSON object.')
+            result, cached = await self.call(function, params)
+        except (ValueError, KeyError, TypeError, OSError) as e :
+            self.stats['errors'] += 1
+            return _json_response(400, {'error': type(e).__name__ + ': ' + str(e)})
+        except Exception as e :
+            self.stats['errors'] += 1
+            return _json_response(500, {'error': type(e).__name__ + ': ' + str(e)})
+
+        if result[0] == 'json' :
+            return _json_response(200, result[1])
+        size, chunks = array_chunks(result[1], result[2], {'function': function, 'cached': cached})
+        return 200, ARRAYS_TYPE, size, chunks
+
+    async def _handle(self, reader, writer):
+        # Answer the requests of one connection until it closes (HTTP/1.1 keep-alive)
+        self._writers.add(writer)
+        try :
+            while True :
+                request_line = await reader.readline()
+                if not request_line.strip() :
+                    break
+                method, target = request_line.decode('latin-1').split()[:2]
+                headers = {}
+                while True :
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b'') :
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY :
+                    status, content_type, size, chunks = _json_response(413, {'error': 'The request body is too large.'})
+                    headers['connection'] = 'close'
+                else :
+                    body = await reader.readexactly(length)
+                    status, content_type, size, chunks = await self._respond(method.upper(), target, body, headers)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(('HTTP/1.1 ' + str(status) + ' ' + REASONS[status] + '\r\nContent-Type: ' + content_type +
+                              '\r\nContent-Length: ' + str(size) + '\r\nConnection: ' + ('keep-alive' if keep_alive else 'close') +
+                              '\r\n\r\n').encode('latin-1'))
+                for chunk in chunks :
+                    writer.write(chunk)
+                    await writer.drain()
+                if not keep_alive :
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) :
+            pass
+        finally :
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        '''
+        Goal: Start listening on host:port, or on the Unix socket path.
+
+        Returns
+        --------
+        address: str
+                 'host:port' (with the port chosen when port is 0) or the socket path.
+        '''
+
+        if path is not None :
+            # a socket left behind by a server that did not shut down is replaced
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode) :
+                os.remove(path)
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+            self.address = path
+        else :
+            self._server = await asyncio.start_server(self._handle, host, port)
+            host, port = self._server.sockets[0].getsockname()[:2]
+            self.address = host + ':' + str(port)
+        return self.address
+
+    async def close(self):
+        # Stop listening and close every open connection
+        if self._server is not None :
+            self._server.close()
+            for writer in list(self._writers) :
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            if self.address is not None and ':' not in self.address and os.path.exists(self.address) :
+                os.remove(self.address)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        # Listen and answer requests until cancelled
+        await self.start(host, port, path)
+        print('sins server listening on ' + self.address, flush=True)
+        try :
+            await asyncio.Event().wait()
+        finally :
+            await self.close()
+
+    def run(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        # Serve in this thread until interrupted
+        try :
+            asyncio.run(self.serve(host, port, path))
+        except KeyboardInterrupt :
+            pass
+        finally :
+            self.executor.shutdown()
+
+    def run_in_thread(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        # Serve from a background thread (e.g. in a notebook or a test) until stop(); returns the address
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(host, port, path), self._loop).result()
+
+    def stop(self):
+        # Stop a server started by run_in_thread
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self.executor.shutdown()
+
+def _json_response(status, value) :
+    # (status, content type, size, chunks) of a JSON answer
+    body = json.dumps(value).encode()
+    return status, 'application/json', len(body), iter([body])
+
+def main(argv=None) :
+    '''
+    Goal: Command line entry point of the server (sins-server / python -m sins.server).
+    '''
+
+    parser = argparse.ArgumentParser(prog='sins-server', description='Serve sins spectra to local scripts from warm in-memory caches.')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to listen on (default: ' + DEFAULT_HOST + ')')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP port (default: ' + str(DEFAULT_PORT) + ', 0 picks a free one)')
+    parser.add_argument('--socket', default=None, help='listen on this Unix socket instead of TCP')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='worker threads (default: number of CPUs)')
+    parser.add_argument('--max-mb', type=float, default=SERVER_CACHE_BYTES / 1024**2, help='size of the in-memory result cache in MB')
+    parser.add_argument('--cache', default=None, help='on-disk result cache directory used by generate')
+    parser.add_argument('--max-tables', type=int, default=SERVER_TABLES, help='number of parsed decay table files kept in memory')
+    args = parser.parse_args(argv)
+
+    SpectrumServer(args.workers, int(args.max_mb * 1024**2), args.cache, args.max_tables).run(args.host, args.port, args.socket)
+    return 0
+
+if __name__ == '__main__' :
+    sys.exit(main())
@@ -6,33 +6,52 @@
 ### Imports & Variables
 ##########################
 
-import csv
-import matplotlib.pyplot as plt
+import argparse
+import contextlib
+import glob
+import io
+import os
+import warnings
+
 import numpy as np
 
+from sins import beta
 from sins.beta import beta_decay_spectrum
 from sins.ec import ec_spectrum 
+from sins.cache import as_cache
+from sins.grid import as_grid
+from sins.instrument import collect, count, timed, timer
+from sins.nuclides import NuclideDB, as_database
+from sins.plotting import plot
+from sins.writers import write_spectrum
 
 ##########################
 ### Getting Inputs
 ##########################
 
 ### Read Data File
+@timed('read_file')
 def read_file(file_name) :
     ''' 
     Goal: Read the provided csv file of the decay pathes of an isotope.
 
+    The file is parsed in memory (see sins.nuclides.parse_decay_table), so a 
+    .txt file is read as it is, without writing a converted csv file, and a 
+    file with errors raises one ValueError listing every bad row. A file of 
+    several isotopes gives the first one, with a warning.
+
     Parameters
     -----------
-    file_name: str
-               The name of the csv file containing the starting isotope and 
-               it's decay paths.
+    file_name: str, path or file object
+               The name of the csv (or txt) file containing the starting 
+               isotope and it's decay paths, an open file, or its contents as 
+               a string.
 
     Returns
     --------
     start_iso: tuple 
                The information about the initial isotope. Follows the format 
-               (Decay Type, Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
+               (Isotope, Z, A, Spin, Parity, Q, Branching Ratio)
     beta_pathes: list
                  This list contains the tuples of information for the beta 
                  decay pathes of the starting isotope
@@ -40,192 +59,181 @@ def read_file(file_name) :
                This list contains the tuples of information for the electron 
                capture decay pathes of the starting isotope
     '''
-    # Check for Basic Errors with the File
-    if type(file_name) != str :     # Check that file name was given as a string
-        raise TypeError('The file name must be inputted as a string.') 
-    
-    if file_name.endswith('.csv') == False :        # Check that a csv file was provided
-        if file_name.endswith('.txt') == True :     # If a txt file was provided, convert it to a csv file
-            with open(file_name, 'r') as in_file:
-                stripped = (line.strip() for line in in_file)
-                lines = (line.split(",") for line in stripped if line)
-                csv_file_name = file_name[:-4] + '.csv'
-                with open(csv_file_name, 'w') as out_file:
-                    writer = csv.writer(out_file)
-                    writer.writerow(('title', 'intro'))                        
-                    writer.writerows(lines)
-                file_name = csv_file_name
-        else :
-            raise Exception('The given file is not a CSV file. Please supply a CSV file.')
-    
-    # Open and prepare csv file
-    with open(file_name) as file :
-        reader = csv.reader(file)
-        header = next(reader)
-
-        beta_pathes = []
-        ec_pathes = []
-
-        # Read each row
-        for row in reader :
-
-            # Check to make sure file is written in the proper format
-            if len(row) != 8 :      # Check there is 8 elements in each row
-                raise Exception('CSV file is not the right dimensions. Please make sure each row has a value for Decay Type, Isotope, Z, A, Spin, Parity, Q, and Branching Ratio.')
-        
-            if row[0].lower() not in ('start','beta','ec') :     # Check that Decay Types were written properly
-                if row[0].lower() == 'electron capture' : 
-                    row[0] = 'EC'
-                else :
-                    raise Exception('Decay type (' + str(row[0]) + ') not written properly. Please either use Start, Beta, or EC.')
-            
-            # Check to make sure each value is the correct type
-            try :       # Are all Z values integers
-                value = int(row[2])
-            except ValueError :
-                print('One of your Z values (' + row[2] + ') is not an integer.')
-
-            try :       # Are all A values integers
-                value = int(row[3])
-            except ValueError :
-                print('One of your A values (' + row[3] + ') is not an integer.')
-            
-            try :       # Are all Spin values floats
-                value = float(row[4])
-            except ValueError :
-                print('One of your spin values (' + row[4] + ') is not a number.')
-
-            try :       # Are all Parity values integers
-                value = float(row[5])
-            except ValueError :
-                print('One of your parity values (' + row[5] + ') is not an integer.')
-
-            try :       # Are all Q values floats
-                value = float(row[6])
-            except ValueError :
-                print('One of your Q values (' + row[6] + ') is not a number.')
-
-            try :       # Are all Branching Ratio values floats
-                value = float(row[7])
-            except ValueError :
-                print('One of your branching ratio values (' + row[7] + ') is not a number.')
-
-            # Define Starting Isotope and Different Pathes
-            if row[0].lower() == 'start' :
-                start_iso = (row[1], int(row[2]), int(row[3]), float(row[4]), \
-                                 int(row[5]), float(row[6]), float(row[7]))
-
-            if row[0].lower() == 'beta' :
-                beta_pathes.append((row[1], int(row[2]), int(row[3]), float(row[4]), \
-                                    int(row[5]), float(row[6]), float(row[7])))
-
-            if row[0].lower() == 'ec' :
-                ec_pathes.append((float(row[6]), float(row[7])))
-
-    return start_iso, beta_pathes, ec_pathes
+
+    database = NuclideDB(file_name)
+    if len(database) == 0 :
+        raise ValueError('The file holds no isotope. Please start it with a Start row.')
+    if len(database) > 1 :
+        warnings.warn('The file holds ' + str(len(database)) + ' isotopes; only the first (' + database.names[0] + 
+                      ') is read. Please use sins.nuclides.NuclideDB (or the database argument of generate) for decay tables of many isotopes.', 
+                      UserWarning)
+    return database[database.names[0]]
 
 ###################
 ### Usable Functions
 ###################
 
-def generate(file_name, gen_files) :
+def generate(file_name, gen_files, grid=None, file_format='csv', cache=None, stats=None, database=None) :
     ''' 
     Goal: Generate Neutrino Spectrum
 
     Parameters
     -----------
     file_name: str
-               A string containing the name of the csv file with the decay paths.
+               A string containing the name of the csv file with the decay paths, 
+               or the name of an isotope of the database.
     gen_files: bolean
                True/False for plotting the spectra and making the associated pdf/csv files.
+    grid: EnergyGrid, float, str or dict
+          The energy grid to evaluate the spectra on (see sins.grid.as_grid), 
+          e.g. 0.5 for a 0.5 keV spacing, {'points': 500} or 'adaptive'. By 
+          default every spectrum is given at each keV.
+    file_format: str or list
+                 The format(s) of the spectrum files written when gen_files is 
+                 True: csv, npy or npz (see sins.writers).
+    cache: str or ResultCache
+           A cache directory (see sins.cache.ResultCache). The spectra are 
+           loaded from it when these decay pathes were generated before, and 
+           stored in it otherwise.
+    stats: callable
+           Called with the timers and counters of this call, a 
+           sins.instrument.Stats (see sins.instrument.collect).
+    database: str or NuclideDB
+              A decay table of many isotopes (see sins.nuclides.NuclideDB), in 
+              which file_name is looked up as an isotope name. A file name is 
+              parsed once and kept while the file is unchanged.
 
     Potential Returns
     -----------------
-    energy: list
-            A list of the energies (in keV) that neutrinos from this isotope may 
-            have. This list is always returned.
-    spectrum: list
-              A list of the neutrino spectrum values (per keV per decay). This 
-              list is always returned.
-    beta_energies: list 
-                   A list of the energies (in keV) that betas from this isotope 
-                   may have. This list is only returned if the isotope decays 
-                   via beta decay and beta_energies does not equal energy.
-    beta_beta: list
-               A list of the beta spectrum values (per keV per decay). This list 
-               is only returned if the isotope decays via beta decay.
+    energy: array
+            The energies (in keV) that neutrinos from this isotope may have. 
+            This is always returned.
+    spectrum: Spectrum
+              The neutrino spectrum (per keV per decay). This is always 
+              returned.
+    beta_energies: array 
+                   The energies (in keV) that betas from this isotope may have. 
+                   This is only returned if the isotope decays via beta decay 
+                   and beta_energies does not equal energy.
+    beta_beta: Spectrum
+               The beta spectrum (per keV per decay). This is only returned if 
+               the isotope decays via beta decay.
     '''
 
-    # Read Input File
-    start, beta_pathes, ec_pathes = read_file(file_name)
-    print(start)
-    
-    # Generate Each Decay Pathes Neutrino Spectrum
-    if beta_pathes != [] :
-        beta_energies, beta_beta, beta_nu = beta_decay_spectrum(start, beta_pathes)
-    if ec_pathes != [] :
-        ec_energies, ec_nu = ec_spectrum(ec_pathes)
-
-    # Define Complete Spectrum
-    energy = []
-    spectrum = []
-
-    # if there is only beta decay
-    if beta_pathes == [] :
-        energy = list(ec_energies)
-        spectrum = ec_nu
+    if stats is not None :
+        with collect(stats) :
+            return generate(file_name, gen_files, grid, file_format, cache, database=database)
 
-        # stretching beyond the peak to properly show it
-        for i in range(int(energy[-1]/10)) :
-            energy.append(energy[-1] + 1)
-            spectrum.append(0)
-    
-    # if there is only electron capture
-    elif ec_pathes == [] :
-        energy = beta_energies
-        spectrum = beta_nu
+    # Read Input File, or Look the Isotope Up
+    if database is not None :
+        start, beta_pathes, ec_pathes = as_database(database)[file_name]
+    else :
+        start, beta_pathes, ec_pathes = read_file(file_name)
+    print(start)
+    grid = as_grid(grid)
     
-    # if there is both beta decay AND electron capture
-    elif beta_pathes != [] and ec_pathes != [] :
-
-        # Fixing that beta energies is off by one due to normalization
-        ec_energies = np.delete(ec_energies, [0])
-        ec_nu.pop(0)
+    # Generate the Spectra, or Load Them from the Cache
+    outputs = cached_spectra(start, beta_pathes, ec_pathes, grid, cache)
 
-        if beta_energies[-1] > ec_energies[-1] :
-            energy = beta_energies
-            max_nu = beta_nu
-            min_energies = ec_energies
-            min_nu = ec_nu
-
-        else :
-            energy = ec_energies
-            max_nu = ec_nu
-            min_energies = beta_energies
-            min_nu = beta_nu
-
-        for e in energy :
-            if e in min_energies :
-                spectrum.append(max_nu[int(e)-1] + min_nu[int(e)-1])
-            else : 
-                spectrum.append(max_nu[int(e)-1])
+    energy, spectrum = outputs[0], outputs[1]
+    if beta_pathes != [] :
+        beta_energies, beta_beta = (energy, outputs[2]) if ec_pathes == [] else (outputs[2], outputs[3])
     
     if gen_files == True :
         # Plot Complete Spectrum
         iso_name = start[0]
         plot(energy, spectrum, 'Neutrino', iso_name)
-        print('File Created: ' + iso_name + '_' + 'Neutrino_Spectrum.png')
         if beta_pathes != [] :
             plot(beta_energies, beta_beta, 'Beta', iso_name)
-            print('File Created: ' + iso_name + '_' + 'Beta_Spectrum.png')
 
-        # Save Spectrum Data as a CSV File
-        make_csv(energy, spectrum, 'Neutrino', iso_name)
-        print('File Created: ' + iso_name + '_' + 'Neutrino_Spectrum.csv')
-        if beta_pathes != [] :
-            make_csv(beta_energies, beta_beta, 'Beta', iso_name)
-            print('File Created: ' + iso_name + '_' + 'Beta_Spectrum.csv')
+        # Save Spectrum Data Files
+        metadata = spectrum_metadata(start, beta_pathes, ec_pathes, grid)
+        for file_type in ([file_format] if isinstance(file_format, str) else file_format) :
+            make_file(energy, spectrum, 'Neutrino', iso_name, file_type, metadata)
+            if beta_pathes != [] :
+                make_file(beta_energies, beta_beta, 'Beta', iso_name, file_type, metadata)
+
+    return outputs
+
+def cached_spectra(start, beta_pathes, ec_pathes, grid=None, cache=None) :
+    # compute_spectra, loading the outputs from the cache (see sins.cache.ResultCache) 
+    # when these decay pathes were generated before and storing them otherwise
+    cache = as_cache(cache)
+    if cache is None :
+        return compute_spectra(start, beta_pathes, ec_pathes, grid)
+
+    key = cache.key(start, beta_pathes, ec_pathes, grid)
+    with timer('cache load') :
+        outputs = cache.load(key)
+    count('cache hits' if outputs is not None else 'cache misses')
+    if outputs is None :
+        outputs = compute_spectra(start, beta_pathes, ec_pathes, grid)
+        with timer('cache store') :
+            cache.store(key, outputs)
+    return outputs
+
+@timed('compute_spectra')
+def compute_spectra(start, beta_pathes, ec_pathes, grid=None) :
+    ''' 
+    Goal: Generate the complete spectra of already parsed decay pathes.
 
+    Parameters
+    -----------
+    start: tuple
+           The starting isotope, as returned by read_file.
+    beta_pathes: list
+                 The beta decay pathes, as returned by read_file.
+    ec_pathes: list
+               The electron capture pathes, as returned by read_file.
+    grid: EnergyGrid, float, str or dict
+          The energy grid (see sins.grid.as_grid).
+
+    Returns
+    --------
+    outputs: tuple
+             The same values generate returns.
+    '''
+
+    grid = as_grid(grid)
+
+    # Generate Each Decay Pathes Neutrino Spectrum
+    if beta_pathes != [] :
+        beta_energies, beta_beta, beta_nu = beta_decay_spectrum(start, beta_pathes, grid=grid)
+    if ec_pathes != [] :
+        if grid is None :
+            ec_energies, ec_nu = ec_spectrum(ec_pathes)
+        else :      # on an energy grid, the electron capture lines are placed on the final energies
+            ec_max = max(path[0] for path in ec_pathes)
+            if beta_pathes == [] :
+                ec_max = ec_max * 1.1       # stretching beyond the peak to properly show it
+                ec_energies, ec_nu = ec_spectrum(ec_pathes, energies=grid.energies(ec_max))
+            else :
+                ec_energies, ec_nu = ec_spectrum(ec_pathes, energies=np.union1d(beta_energies, grid.energies(ec_max)))
+
+    # Define Complete Spectrum
+    with timer('merge') :
+        # if there is only electron capture
+        if beta_pathes == [] :
+            spectrum = ec_nu
+
+            # stretching beyond the peak to properly show it
+            if grid is None :
+                spectrum = ec_nu.extended(ec_energies[-1] + np.arange(1, int(ec_energies[-1]/10) + 1))
+    
+        # if there is only beta decay
+        elif ec_pathes == [] :
+            spectrum = beta_nu
+    
+        # if there is both beta decay AND electron capture
+        else :
+            # Fixing that beta energies is off by one due to normalization
+            if grid is None :
+                ec_nu = ec_nu.rebin(ec_energies[1:])
+
+            spectrum = beta_nu + ec_nu
+
+    energy = spectrum.energies
+    
     # Return the proper values
     if beta_pathes == [] :
         return energy, spectrum
@@ -234,9 +242,121 @@ def generate(file_name, gen_files) :
     elif beta_pathes != [] and ec_pathes != [] :
         return energy, spectrum, beta_energies, beta_beta 
 
-def plot(energy, spectrum, particle, iso_name) :
+def generate_many(files, gen_files=False, workers=None, cache=None, database=None, grid=None) :
     ''' 
-    Goal: Plot Spectra
+    Goal: Generate the neutrino spectra of many isotopes in parallel.
+
+    Parameters
+    -----------
+    files: str or list
+           A list of csv file names, a glob pattern (e.g. 'tests/*/*.csv'), or 
+           a directory whose csv files should all be generated.
+    gen_files: bolean
+               True/False for plotting the spectra and making the associated 
+               png/csv files for every isotope. The plots are rendered by the 
+               worker processes, off screen (see sins.plotting.render).
+    workers: int
+             The number of worker processes. Defaults to the number of CPUs; 
+             1 runs every file in this process.
+    cache: str
+           A result cache directory shared by all workers (see generate).
+    database: str or NuclideDB
+              A decay table in which files are looked up as isotope names 
+              (see generate). A file name is parsed once per worker.
+    grid: EnergyGrid, float, str or dict
+          The energy grid of every isotope (see generate).
+
+    Returns
+    --------
+    results: list
+             One (file_name, outputs, error) tuple per file, in input order. 
+             outputs holds what generate returned for that file and error is 
+             None, or outputs is None and error describes why the file failed.
+    '''
+
+    # Expand Directories and Glob Patterns (isotope names are kept as they are)
+    files = [files] if isinstance(files, str) else files
+    if database is None :
+        files = _expand_files(files)
+
+    # Run Each File, Serially or Across a Process Pool
+    return _run_many(_generate_one, files, workers, gen_files, cache, database, grid)
+
+def _run_many(job, files, workers=None, *arguments) :
+    # job(file_name, *arguments) for every file, serially or across a process pool, in input order
+    if workers is None :
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(files) <= 1 :
+        return [job(file_name, *arguments) for file_name in files]
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor :
+        return list(executor.map(job, files, *[[argument] * len(files) for argument in arguments]))
+
+def _expand_files(patterns) :
+    # Turn csv files, directories and glob patterns into a flat list of files
+    files = []
+    for pattern in patterns :
+        if os.path.isdir(pattern) :
+            files.extend(sorted(glob.glob(os.path.join(pattern, '*.csv'))))
+        elif any(char in pattern for char in '*?[') :
+            files.extend(sorted(glob.glob(pattern)))
+        else :      # Plain file names are kept so missing files are reported as failures
+            files.append(pattern)
+    return files
+
+def _generate_one(file_name, gen_files, cache=None, database=None, grid=None) :
+    # Run generate on one file, capturing its printed progress and any failure
+    try :
+        with contextlib.redirect_stdout(io.StringIO()) :
+            outputs = generate(file_name, gen_files, grid, cache=cache, database=database)
+        return file_name, outputs, None
+    except Exception as e :
+        return file_name, None, type(e).__name__ + ': ' + str(e)
+
+def main(argv=None) :
+    ''' 
+    Goal: Command line entry point for batch generation (sins / python -m sins).
+    '''
+
+    parser = argparse.ArgumentParser(prog='sins', description='Generate neutrino spectra from isotope decay csv files.')
+    parser.add_argument('files', nargs='+', help='csv files, glob patterns or directories')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--no-files', action='store_true', help='do not write the png/csv output files')
+    parser.add_argument('--cache', default=None, help='result cache directory')
+    parser.add_argument('--database', default=None, help='decay table of many isotopes; the files are then isotope names')
+    parser.add_argument('--library', default=None, help='add the spectra to this spectrum library file instead of writing files')
+    parser.add_argument('--width', type=float, default=None, help='energy grid spacing in keV (default: 1 keV)')
+    parser.add_argument('--points', type=int, default=None, help='number of energy grid points of each spectrum')
+    parser.add_argument('--adaptive', action='store_true', help='place the energy grid points densely near both ends of each spectrum')
+    args = parser.parse_args(argv)
+
+    # The Energy Grid (see sins.grid.EnergyGrid)
+    grid = {key: value for key, value in (('width', args.width), ('points', args.points)) if value is not None}
+    if args.adaptive :
+        grid['adaptive'] = True
+    grid = as_grid(grid) if grid else None
+
+    if args.library is not None :
+        from sins.library import SpectrumLibrary
+        library = SpectrumLibrary(args.library)
+        results = library.build(args.files, grid, args.workers, args.cache, args.database)
+    else :
+        results = generate_many(args.files, not args.no_files, args.workers, args.cache, args.database, grid)
+
+    failures = 0
+    for file_name, _, error in results :
+        if error is None :
+            print('File Processed: ' + file_name)
+        else :
+            failures += 1
+            print('File Failed: ' + file_name + ' - ' + error)
+
+    return 1 if failures else 0
+
+def make_csv(energy, spectrum, particle, iso_name) :
+    ''' 
+    Goal: Generate csv file with the given spectrum data.
 
     Parameters
     -----------
@@ -250,17 +370,12 @@ def plot(energy, spectrum, particle, iso_name) :
               Name of the isotope of interest.
     '''
 
-    plt.plot(energy, spectrum, color='black')
-    plt.ylabel('dN/dE (' + particle + 's/keV/Decay)')
-    plt.xlabel(particle + ' Energy (keV)')
-    plt.title(iso_name + ' ' + particle + ' Spectrum')
-    plt.savefig(iso_name + '_' + particle + '_Spectrum.png')
-    print('File Created: ' + iso_name + '_' + particle + '_Spectrum.png')
-    plt.show()
+    make_file(energy, spectrum, particle, iso_name, 'csv')
 
-def make_csv(energy, spectrum, particle, iso_name) :
+@timed('make_file')
+def make_file(energy, spectrum, particle, iso_name, file_format='csv', metadata=None) :
     ''' 
-    Goal: Generate csv file with the given spectrum data.
+    Goal: Generate a spectrum data file in the given format.
 
     Parameters
     -----------
@@ -272,15 +387,24 @@ def make_csv(energy, spectrum, particle, iso_name) :
               The particle being shown in the spectrum.
     iso_name: str
               Name of the isotope of interest.
+    file_format: str
+                 csv, npy (memory-mappable, metadata in a .json file next to 
+                 it), npz, or a format added with sins.writers.register_writer.
+    metadata: dict
+              Information stored with the binary formats.
     '''
 
-    csv_file = iso_name + '_' + particle + '_Spectrum.csv'
-
-    with open(csv_file, 'w', newline='') as file:
-        fieldnames = ['energy', 'dN/dE']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        for i in range(len(energy)) :
-            writer.writerow({'energy': energy[i], 'dN/dE': spectrum[i]})
-
-    print('File Created: ' + iso_name + '_' + particle + '_Spectrum.csv')
+    metadata = dict(metadata or {}, particle=particle)
+    file_name = write_spectrum(energy, spectrum, particle, iso_name, file_format, metadata)
+    count('bytes written', os.path.getsize(file_name))
+    print('File Created: ' + file_name)
+
+def spectrum_metadata(start, beta_pathes, ec_pathes, grid=None) :
+    # Description of how a spectrum was generated, stored with the binary formats
+    return {'isotope': start[0],
+            'beta_q_values': [path[5] for path in beta_pathes],
+            'beta_branching_ratios': [path[6] for path in beta_pathes],
+            'ec_q_values': [path[0] for path in ec_pathes],
+            'ec_branching_ratios': [path[1] for path in ec_pathes],
+            'grid': None if grid is None else repr(grid),
+            'coulomb': beta.COULOMB_MODE}
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import numpy as np
+
+from sins.grid import trapezoid_weights
+
+##########################
+### Spectrum Container
+##########################
+
+class Spectrum:
+    '''
+    Goal: Hold a spectrum (per keV per decay) and the energies (in keV) it is
+    sampled at in contiguous NumPy arrays.
+
+    Spectra on different grids can be added: both are linearly interpolated
+    onto the union of their grids and are zero outside their own energy range.
+    A Spectrum also behaves like the list of its values (len, indexing,
+    iteration, np.asarray), so code written for the list spectra keeps working.
+
+    Parameters
+    -----------
+    energies: array
+              The energies of each value, in increasing order.
+    values: array
+            The spectrum values.
+    '''
+
+    __slots__ = ('energies', 'values')
+
+    def __init__(self, energies, values):
+        self.energies = np.ascontiguousarray(energies, dtype=float)
+        self.values = np.ascontiguousarray(values, dtype=float)
+        if self.energies.shape != self.values.shape or self.energies.ndim != 1 :
+            raise ValueError('A spectrum needs one value for each energy.')
+
+    def __repr__(self):
+        if len(self) == 0 :
+            return 'Spectrum(empty)'
+        return 'Spectrum(' + str(len(self)) + ' points, ' + str(self.energies[0]) + '-' + \
+               str(self.energies[-1]) + ' keV)'
+
+    ### Sequence Behaviour
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    ### Arithmetic
+    def __add__(self, other):
+        if isinstance(other, (int, float)) and other == 0 :     # So that sum() works
+            return Spectrum(self.energies, self.values)
+        if not isinstance(other, Spectrum) :
+            return NotImplemented
+        return Spectrum.total([self, other])
+
+    __radd__ = __add__
+
+    def __mul__(self, factor):
+        return Spectrum(self.energies, self.values * factor)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, factor):
+        return Spectrum(self.energies, self.values / factor)
+
+    @staticmethod
+    def union(spectra):
+        # The union of the grids of many spectra (the shared grid when they are all equal)
+        energies = spectra[0].energies
+        if any(len(spectrum.energies) != len(energies) or (spectrum.energies != energies).any() for spectrum in spectra[1:]) :
+            energies = np.unique(np.concatenate([spectrum.energies for spectrum in spectra]))
+        return energies
+
+    @staticmethod
+    def total(spectra):
+        # Sum many spectra at once on the union of their grids
+        spectra = list(spectra)
+        if len(spectra) == 0 :
+            return Spectrum([], [])
+        energies = Spectrum.union(spectra)
+
+        values = np.zeros(len(energies))
+        for spectrum in spectra :
+            values += spectrum.at(energies)
+        return Spectrum(energies, values)
+
+    ### Grid Operations
+    def at(self, energies):
+        # Linearly interpolated values at the given energies (zero outside this spectrum)
+        if len(self) == 0 :
+            return np.zeros(np.shape(energies))
+        return np.interp(energies, self.energies, self.values, left=0, right=0)
+
+    def rebin(self, energies):
+        # This spectrum interpolated onto new energies
+        energies = np.asarray(energies, dtype=float)
+        return Spectrum(energies, self.at(energies))
+
+    def closed(self):
+        # This spectrum with a zero added just above its last energy, so it
+        # drops to zero there instead of ramping down to the next point of a
+        # spectrum it is added to (keeps the step at a neutrino endpoint)
+        return Spectrum(np.append(self.energies, np.nextafter(self.energies[-1], np.inf)),
+                        np.append(self.values, 0.))
+
+    def extended(self, energies):
+        # This spectrum with zeros at extra energies above its last one
+        energies = np.asarray(energies, dtype=float)
+        return Spectrum(np.append(self.energies, energies), np.append(self.values, np.zeros(len(energies))))
+
+    ### Integrals
+    def integrate(self):
+        # Trapezoid integral over the spectrum (per decay)
+        return np.dot(trapezoid_weights(self.energies), self.values)
+
+    def mean(self):
+        # Mean energy in keV
+        weights = trapezoid_weights(self.energies) * self.values
+        return np.dot(weights, self.energies) / weights.sum()
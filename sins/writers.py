@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+##########################
+### Imports & Variables
+##########################
+
+import json
+import os
+
+import numpy as np
+
+##########################
+### Spectrum Writers
+##########################
+
+def write_csv(file_base, energies, values, metadata=None) :
+    '''
+    Goal: Write a spectrum as a two column csv file (energy, dN/dE) in one
+    bulk write. The metadata is not stored.
+    '''
+
+    file_name = file_base + '.csv'
+    rows = map('{},{}'.format, np.asarray(energies).tolist(), np.asarray(values).tolist())
+    with open(file_name, 'w', newline='') as file :
+        file.write('energy,dN/dE\r\n' + '\r\n'.join(rows) + '\r\n')
+    return file_name
+
+def write_npy(file_base, energies, values, metadata=None) :
+    '''
+    Goal: Write a spectrum as a (2, N) array of energies and values in a .npy
+    file, which np.load(file_name, mmap_mode='r') can memory-map. The metadata
+    is written next to it as a .json file.
+    '''
+
+    file_name = file_base + '.npy'
+    np.save(file_name, np.stack([np.asarray(energies, dtype=float), np.asarray(values, dtype=float)]))
+    with open(file_base + '.json', 'w') as file :
+        json.dump(metadata or {}, file)
+    return file_name
+
+def write_npz(file_base, energies, values, metadata=None) :
+    '''
+    Goal: Write the energies, values and metadata (as a JSON string) of a
+    spectrum to one uncompressed .npz file.
+    '''
+
+    file_name = file_base + '.npz'
+    np.savez(file_name, energies=np.asarray(energies, dtype=float), values=np.asarray(values, dtype=float),
+             metadata=np.array(json.dumps(metadata or {})))
+    return file_name
+
+WRITERS = {'csv': write_csv, 'npy': write_npy, 'npz': write_npz}
+
+def register_writer(file_format, writer) :
+    '''
+    Goal: Add an output format. writer(file_base, energies, values, metadata)
+    must write the file and return its name.
+    '''
+
+    WRITERS[file_format.lower()] = writer
+
+def write_spectrum(energy, spectrum, particle, iso_name, file_format='csv', metadata=None) :
+    '''
+    Goal: Write a spectrum to <iso_name>_<particle>_Spectrum.<file_format>.
+
+    Parameters
+    -----------
+    energy: array
+            The energies associated with the provided spectra.
+    spectrum: array
+              The number of particle per keV per decay.
+    particle: str
+              The particle being shown in the spectrum.
+    iso_name: str
+              Name of the isotope of interest.
+    file_format: str
+                 One of the WRITERS (csv, npy, npz or a registered format).
+    metadata: dict
+              JSON serializable information stored by the binary formats.
+
+    Returns
+    --------
+    file_name: str
+               The name of the written file.
+    '''
+
+    if file_format.lower() not in WRITERS :
+        raise ValueError('Unknown file format (' + file_format + '). Please use one of ' + ', '.join(WRITERS) + '.')
+    return WRITERS[file_format.lower()](iso_name + '_' + particle + '_Spectrum', energy, spectrum, metadata)
+
+def read_spectrum(file_name, mmap_mode='r') :
+    '''
+    Goal: Read a spectrum written by write_spectrum.
+
+    Parameters
+    -----------
+    file_name: str
+               A .csv, .npy or .npz spectrum file.
+    mmap_mode: str
+               Memory-map mode for .npy files (None reads them into memory).
+
+    Returns
+    --------
+    energies: array
+              The energies of the spectrum (a memory-mapped view for .npy).
+    values: array
+            The spectrum values (a memory-mapped view for .npy).
+    metadata: dict
+              The stored metadata (empty for csv files).
+    '''
+
+    if file_name.endswith('.npy') :
+        data = np.load(file_name, mmap_mode=mmap_mode)
+        metadata = {}
+        if os.path.isfile(file_name[:-4] + '.json') :
+            with open(file_name[:-4] + '.json') as file :
+                metadata = json.load(file)
+        return data[0], data[1], metadata
+
+    if file_name.endswith('.npz') :
+        with np.load(file_name) as data :
+            return data['energies'], data['values'], json.loads(str(data['metadata']))
+
+    data = np.loadtxt(file_name, delimiter=',', skiprows=1, ndmin=2)
+    return data[:, 0], data[:, 1], {}
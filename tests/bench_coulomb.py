@@ -0,0 +1,34 @@
+import time
+import timeit
+import numpy as np
+from sins.beta import Isotope, SetDecayProcess, beta_spectrum, fermi_table, use_coulomb
+
+### Cost of the exact Coulomb amplitudes against the approximate (λ = 1) kernel per energy
+### point for forbiddenness n = 0..4, with the largest change of the spectrum
+
+def run_benchmark(Z=77, A=192, Q=1000, points=1000, repeat=5):
+    parent = Isotope('Parent', Z - 1, A, 0.0, 1)
+    energies = np.linspace(1, Q - 1, points)
+
+    with use_coulomb('exact'):
+        start = time.perf_counter()
+        for k in range(1, 6):
+            fermi_table(Z, A, k=k, exact=True)
+        build = time.perf_counter() - start
+    print(f"exact tables for k = 1..5 built in {build:.2f} s")
+
+    print(f"{'n':>2} {'approximate (us/point)':>23} {'exact (us/point)':>17} {'exact tables (us/point)':>24} {'max |exact/approximate - 1|':>28}")
+    for n in range(5):
+        progeny = Isotope('Progeny', Z, A, float(n + 1), 1)
+        process = SetDecayProcess(parent, progeny, Q)
+
+        approximate = min(timeit.repeat(lambda: beta_spectrum(process, energies), number=1, repeat=repeat)) / points
+        reference = beta_spectrum(process, energies)
+        with use_coulomb('exact'):
+            exact = min(timeit.repeat(lambda: beta_spectrum(process, energies), number=1, repeat=repeat)) / points
+            tables = min(timeit.repeat(lambda: beta_spectrum(process, energies, tables=True), number=1, repeat=repeat)) / points
+            change = np.max(np.abs(beta_spectrum(process, energies) / reference - 1))
+        print(f"{n:>2} {approximate * 1e6:>23.3f} {exact * 1e6:>17.3f} {tables * 1e6:>24.3f} {change:>28.4f}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+### Startup-time benchmark: `import sins` must stay light enough for short-lived worker processes
+
+IMPORT_BUDGET = 1.0     # seconds of cumulative import time allowed for `import sins`
+FORBIDDEN = ('matplotlib', 'sklearn', 'scipy.integrate', 'scipy.interpolate')
+
+def import_times(module='sins'):
+    # Cumulative import time (in seconds) of every module loaded by `import module`
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+def run_benchmark(repeat=5):
+    runs = [import_times() for _ in range(repeat)]
+    best = min(times['sins'] for times in runs)
+    print(f"import sins: {best * 1000:.1f} ms (best of {repeat})")
+
+    loaded = [name for name in FORBIDDEN if any(module == name or module.startswith(name + '.') for module in runs[0])]
+    if loaded:
+        print(f"import sins: FAIL - loads {', '.join(loaded)}")
+    elif best > IMPORT_BUDGET:
+        print(f"import sins: FAIL - over the {IMPORT_BUDGET:.1f} s budget")
+    else:
+        print("import sins: PASS")
+
+if __name__ == "__main__":
+    run_benchmark()
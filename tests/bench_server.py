@@ -0,0 +1,93 @@
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+
+from sins.client import SpectrumClient
+
+### Load test of the spectrum server (sins.server): latency of cache misses and hits, from one
+### and from many concurrent clients, merged identical requests, and the cost of a script that
+### imports sins and computes the spectrum itself instead
+
+ISOTOPES = ['Cs-137', 'Co-57', 'Cd-109', 'Ir-192']
+CLIENT_SCRIPT = ("import importlib.util, sys; spec = importlib.util.spec_from_file_location('client', sys.argv[1]); "
+                 "client = importlib.util.module_from_spec(spec); spec.loader.exec_module(client); "
+                 "client.SpectrumClient(sys.argv[2]).generate(sys.argv[3])")
+DIRECT_SCRIPT = ("import contextlib, io, sys, warnings; warnings.simplefilter('ignore'); import sins; "
+                 "contextlib.redirect_stdout(io.StringIO()).__enter__(); sins.generate(sys.argv[1], False)")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+def csv_file(isotope):
+    return os.path.join(HERE, isotope, isotope.lower() + '.csv')
+
+def timed_requests(address, requests, clients=1):
+    # Latency in seconds of every request, spread over concurrent clients (each with its own connection)
+    latencies = []
+    def run(share):
+        with SpectrumClient(address) as client:
+            for file, grid in share:
+                start = time.perf_counter()
+                client.generate(file, grid=grid)
+                latencies.append(time.perf_counter() - start)
+    threads = [threading.Thread(target=run, args=(requests[i::clients],)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies), time.perf_counter() - start
+
+def report(case, latencies, seconds):
+    print(f"{case:<34} {len(latencies):>8} {np.percentile(latencies, 50) * 1e3:>9.2f} "
+          f"{np.percentile(latencies, 95) * 1e3:>9.2f} {len(latencies) / seconds:>10.1f}")
+
+def run_benchmark(requests=200, clients=8, scripts=3):
+    environment = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''), PYTHONWARNINGS='ignore')
+    server = subprocess.Popen([sys.executable, '-m', 'sins.server', '--port', '0'], stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, text=True, env=environment)
+    try:
+        address = server.stdout.readline().split()[-1]
+        print(f"server at {address}")
+        print(f"{'case':<34} {'requests':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'req/s':>10}")
+
+        # every (isotope, grid) pair is new to the server, then asked again
+        grids = [0.5 + 0.01 * i for i in range(max(requests // len(ISOTOPES), 1))]
+        unique = [(csv_file(isotope), grid) for grid in grids for isotope in ISOTOPES]
+        report('miss, 1 client', *timed_requests(address, unique))
+        report('hit, 1 client', *timed_requests(address, unique))
+        report(f'hit, {clients} clients', *timed_requests(address, unique * 4, clients))
+
+        # identical requests arriving together are computed once
+        with SpectrumClient(address) as client:
+            before = client.stats()
+            latencies, seconds = timed_requests(address, [(csv_file('Ir-192'), 0.05)] * clients, clients)
+            after = client.stats()
+        report(f'same miss, {clients} clients', latencies, seconds)
+        print(f"  computed {after['misses'] - before['misses']}x, merged {after['coalesced'] - before['coalesced']}x, "
+              f"{after['entries']} results ({after['bytes'] / 1e6:.1f} MB) in memory")
+
+        # a short script: a thin client call against importing sins and computing
+        for name, command in (('script with the client', [sys.executable, '-c', CLIENT_SCRIPT, os.path.join(ROOT, 'sins', 'client.py'), address, csv_file('Ir-192')]),
+                              ('script importing sins', [sys.executable, '-c', DIRECT_SCRIPT, csv_file('Ir-192')])):
+            latencies = []
+            for _ in range(scripts):
+                start = time.perf_counter()
+                subprocess.run(command, check=True, env=environment, cwd=ROOT)
+                latencies.append(time.perf_counter() - start)
+            report(name, np.array(latencies), sum(latencies))
+    finally:
+        server.terminate()
+        server.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load test the sins spectrum server.')
+    parser.add_argument('-n', '--requests', type=int, default=200, help='Distinct requests (isotope and grid pairs).')
+    parser.add_argument('-c', '--clients', type=int, default=8, help='Concurrent clients.')
+    parser.add_argument('-s', '--scripts', type=int, default=3, help='Runs of each short script.')
+    args = parser.parse_args()
+    run_benchmark(args.requests, args.clients, args.scripts)
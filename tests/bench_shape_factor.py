@@ -0,0 +1,66 @@
+import timeit
+import numpy as np
+from sins.backends import available_backends, use_backend
+from sins.beta import Isotope, SetDecayProcess, beta_spectrum, df2, p, ν, μ
+
+### Micro-benchmark of the beta kernel per energy point for forbiddenness n = 0..4,
+### against the shape factor before the Coulomb terms were shared (kept below),
+### with an array column for every installed kernel backend
+
+def before_wave_func(k, Z, W, A=0, lambda_appproximation=True):
+    # wave_func before coulomb_terms: μ(±1) is recomputed for every k
+    k_eff = 1 if lambda_appproximation else k
+    term2 = abs(μ(1, Z, W, A))**2 + abs(μ(-1, Z, W, A))**2
+    term1 = abs(μ(k_eff, Z, W, A))**2 + abs(μ(-k_eff, Z, W, A))**2
+    return term1 / term2
+
+def before_spectrum(process, K_e):
+    # beta_spectrum before coulomb_terms and shape_coefficients, for the same energies
+    Q = process.QValue
+    Z = process.progenyAtom.AtomicNumber
+    A = process.parentAtom.AtomicMass
+    n = max(process.deltaJ - 1, 0)
+    W_e = ν(K_e)
+    W_ν = ν(Q) - W_e
+    p_e = p(W_e, 1)
+    p_ν = p(W_ν, 0)
+
+    total = 0.0
+    for k in range(1, n+2):
+        total += before_wave_func(k, Z, W_e, A) * p_e**(2 * (k - 1)) * p_ν**(2 * (n - k + 1)) / df2(2 * k - 1) / df2(2 * (n - k + 1) + 1)
+    C_W = df2(2 * n + 1) * total
+    F_Z = (abs(μ(1, Z, W_e))**2 + abs(μ(-1, Z, W_e))**2) / (2 * p(W_e)**2)
+    return F_Z * C_W * (p_e * W_e) * (W_ν * p_ν)
+
+def per_point(function, energies, repeat):
+    # Best time per energy point of function(energies), in seconds
+    return min(timeit.repeat(lambda: function(energies), number=1, repeat=repeat)) / len(energies)
+
+def run_benchmark(Q=1000, points=1000, repeat=5):
+    parent = Isotope('Parent', 55, 137, 0.0, 1)
+    energies = np.linspace(1, Q - 1, points)
+    scalar_energies = energies[::max(points // 100, 1)]
+
+    backends = available_backends()
+    print(f"{'n':>2} {'scalar before (us)':>19} {'scalar after (us)':>18} {'array before (us)':>18}"
+          + ''.join(f" {name + ' after (us)':>17}" for name in backends) + f" {'after/before spread':>20}")
+    for n in range(5):
+        progeny = Isotope('Progeny', 56, 137, float(n + 1), 1)
+        process = SetDecayProcess(parent, progeny, Q)
+
+        scalar_before = per_point(lambda K: [before_spectrum(process, k) for k in K], scalar_energies, repeat)
+        with use_backend('numpy'):
+            scalar_after = per_point(lambda K: [beta_spectrum(process, k) for k in K], scalar_energies, repeat)
+            after = beta_spectrum(process, energies)
+        before = per_point(lambda K: before_spectrum(process, K), energies, repeat)
+        arrays = []
+        for name in backends:
+            with use_backend(name):
+                arrays.append(per_point(lambda K: beta_spectrum(process, K), energies, repeat))
+        # Fermi_func now receives A, which rescales the spectrum by a constant
+        ratio = after / before_spectrum(process, energies)
+        print(f"{n:>2} {scalar_before * 1e6:>19.2f} {scalar_after * 1e6:>18.2f} {before * 1e6:>18.3f}"
+              + ''.join(f" {array * 1e6:>17.3f}" for array in arrays) + f" {np.ptp(ratio) / ratio.mean():>20.2e}")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,158 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+import numpy as np
+import sins
+from sins.sins import generate, read_file
+from sins.backends import current_backend, set_backend
+from sins import beta
+from sins.beta import beta_decay_spectrum
+from sins.ec import ec_spectrum
+from sins.grid import trapezoid_weights
+from sins.plotting import render
+from sins.sampler import Sampler
+from sins.writers import read_spectrum
+
+### Benchmark suite: per-stage wall time, points (or samples) per second and peak memory for the
+### bundled isotopes and synthetic cases, with an accuracy check against the reference spectra
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ISOTOPES = ('Cs-137', 'Co-57', 'Cd-109', 'Ir-192')
+TOLERANCE = 1e-2        # Allowed difference from the reference spectra, relative to their peak and integral
+SAMPLES = 1000000       # Neutrino energies drawn per sampling benchmark
+
+# Synthetic (start, beta_pathes) cases with no reference file; their spectra must integrate to the branching ratios
+SYNTHETIC = {
+    'high-Q': (('Parent', 38, 90, 0.0, 1, 0, 0),
+               [('Progeny', 39, 90, 0.0, 1, 10000., 1.0)]),
+    'forbidden': (('Parent', 55, 137, 0.0, 1, 0, 0),
+                  [('Progeny', 56, 137, float(dJ), 1, 3000., 0.25) for dJ in range(2, 6)]),
+}
+
+def measure(function, *args, repeat=3, **kwargs):
+    # Best wall time over repeat calls, the peak traced memory of one call, and its result
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_bytes': peak}, result
+
+def grid_points(pathes):
+    # Kernel energy points evaluated on the default 1 keV grid
+    return sum(int(path[5]) + 1 for path in pathes)
+
+def stage(results, name, points, function, *args, repeat=3, unit='points', **kwargs):
+    timing, result = measure(function, *args, repeat=repeat, **kwargs)
+    if points:
+        timing[unit] = points
+        timing[unit + '_per_second'] = points / timing['seconds']
+    results[name] = timing
+    return result
+
+def compare(energies, values, reference_file, tolerance):
+    # Largest difference from the reference, relative to its peak, and the relative difference of the integrals
+    reference_energies, reference_values, _ = read_spectrum(reference_file)
+    values = np.interp(reference_energies, np.asarray(energies, dtype=float), np.asarray(values, dtype=float), left=0, right=0)
+    scale = np.max(np.abs(reference_values))
+    peak = float(np.max(np.abs(values - reference_values)) / scale) if scale > 0 else 0.
+    weights = trapezoid_weights(reference_energies)
+    reference_integral = reference_values @ weights
+    integral = float(values @ weights / reference_integral - 1) if reference_integral > 0 else 0.
+    return {'reference': os.path.relpath(reference_file, HERE), 'peak_difference': peak,
+            'integral_difference': integral, 'passed': peak <= tolerance and abs(integral) <= tolerance}
+
+def bench_isotope(name, repeat, tolerance):
+    directory = os.path.join(HERE, name)
+    file_name = os.path.join(directory, name.lower() + '.csv')
+    stages = {}
+
+    start, beta_pathes, ec_pathes = stage(stages, 'read_file', 0, read_file, file_name, repeat=repeat)
+    if beta_pathes:
+        stage(stages, 'beta_decay_spectrum', grid_points(beta_pathes), beta_decay_spectrum, start, beta_pathes, repeat=repeat)
+    if ec_pathes:
+        stage(stages, 'ec_spectrum', int(max(path[0] for path in ec_pathes)) + 1, ec_spectrum, ec_pathes, repeat=repeat)
+    outputs = stage(stages, 'generate', grid_points(beta_pathes), generate, file_name, False, repeat=repeat)
+    sampler = stage(stages, 'Sampler.from_file', 0, Sampler.from_file, file_name, repeat=repeat)
+    stage(stages, 'Sampler.sample', SAMPLES, sampler.sample, SAMPLES, 0, repeat=repeat, unit='samples')
+    with tempfile.TemporaryDirectory() as plot_directory:
+        stage(stages, 'render', len(outputs[0]), render, outputs[0], outputs[1], 'Neutrino', name,
+              os.path.join(plot_directory, 'plot.png'), repeat=repeat)
+
+    accuracy = {}
+    spectra = {'Neutrino': (outputs[0], outputs[1])}
+    if beta_pathes:
+        spectra['Beta'] = (outputs[0], outputs[2]) if len(outputs) == 3 else (outputs[2], outputs[3])
+    for particle, (energies, values) in spectra.items():
+        reference_file = os.path.join(directory, name + '_' + particle + '_Spectrum.csv')
+        if os.path.isfile(reference_file):
+            accuracy[particle] = compare(energies, values, reference_file, tolerance)
+    return {'stages': stages, 'accuracy': accuracy}
+
+def bench_synthetic(name, repeat, tolerance):
+    start, beta_pathes = SYNTHETIC[name]
+    stages = {}
+    energies, total_beta, total_nu = stage(stages, 'beta_decay_spectrum', grid_points(beta_pathes),
+                                           beta_decay_spectrum, start, beta_pathes, repeat=repeat)
+    branching = sum(path[6] for path in beta_pathes)
+    accuracy = {}
+    for particle, spectrum in (('Neutrino', total_nu), ('Beta', total_beta)):
+        difference = float(spectrum.integrate() / branching - 1)
+        accuracy[particle] = {'integral_difference': difference, 'passed': abs(difference) <= tolerance}
+    return {'stages': stages, 'accuracy': accuracy}
+
+def run_benchmark(repeat=3, tolerance=TOLERANCE, output='bench_results.json'):
+    report = {'sins_version': sins.__version__, 'python': platform.python_version(),
+              'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor(),
+              'cpu_count': os.cpu_count(), 'backend': current_backend(), 'coulomb': beta.COULOMB_MODE, 'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+              'repeat': repeat, 'tolerance': tolerance, 'cases': {}}
+
+    cases = [(name, bench_isotope) for name in ISOTOPES] + [(name, bench_synthetic) for name in SYNTHETIC]
+    print(f"{'case':<10} {'stage':<20} {'time (ms)':>10} {'points/s':>12} {'peak (MB)':>10}   (samples/s for Sampler.sample)")
+    for name, bench in cases:
+        result = bench(name, repeat, tolerance)
+        report['cases'][name] = result
+        for stage_name, timing in result['stages'].items():
+            rate = timing.get('points_per_second', timing.get('samples_per_second'))
+            rate = f"{rate:>12.3g}" if rate is not None else f"{'':>12}"
+            print(f"{name:<10} {stage_name:<20} {timing['seconds'] * 1000:>10.2f} {rate} {timing['peak_bytes'] / 1e6:>10.2f}")
+        for particle, check in result['accuracy'].items():
+            print(f"{name:<10} {particle + ' accuracy':<20} {'PASS' if check['passed'] else 'FAIL'} "
+                  f"(integral {check['integral_difference']:+.2e})")
+
+    report['passed'] = all(check['passed'] for case in report['cases'].values() for check in case['accuracy'].values())
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"benchmark suite: {'PASS' if report['passed'] else 'FAIL'} - results written to {output}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time the sins pipeline and check it against the reference spectra.')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Timed calls per stage (the best is kept).')
+    parser.add_argument('-t', '--tolerance', type=float, default=TOLERANCE, help='Allowed relative difference from the references.')
+    parser.add_argument('-b', '--backend', default=None, help='Kernel backend (numpy, numba), see sins.backends.')
+    parser.add_argument('-c', '--coulomb', default=None, help='Coulomb amplitudes (approximate, exact), see sins.beta.COULOMB_MODE.')
+    parser.add_argument('-o', '--output', default='bench_results.json', help='JSON file for the results.')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore', RuntimeWarning)
+    if args.backend is not None:
+        set_backend(args.backend)
+    if args.coulomb is not None:
+        beta.COULOMB_MODE = args.coulomb.lower()
+    report = run_benchmark(args.repeat, args.tolerance, args.output)
+    sys.exit(0 if report['passed'] else 1)
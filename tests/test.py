@@ -1,8 +1,14 @@
 import os
+import tempfile
+import numpy as np
 from sins.sins import generate
+from sins.sins import generate_many
 from sins.sins import read_file
 from sins.beta import beta_decay_spectrum
+from sins.beta import Isotope, SetDecayProcess, beta_spectrum, neutrino_spectrum
 from sins.ec import ec_spectrum
+from sins.grid import trapezoid_weights
+from sins.spectrum import Spectrum
 
 def run_tests():
     csv_path = './Ir-192/ir-192.csv'   ### Can change test isotope here
@@ -36,6 +42,156 @@ def run_tests():
     else:
         print("beta_decay_spectrum: SKIPPED - no beta paths")
 
+    # Test vectorized kernel against the scalar kernel
+    if beta_pathes:
+        try:
+            path = beta_pathes[-1]
+            parent = Isotope(*start_iso[:5])
+            progeny = Isotope(*path[:5])
+            process = SetDecayProcess(parent, progeny, int(path[5]))
+            grid = np.linspace(1, int(path[5]) - 1, 25)
+            for spectrum in (beta_spectrum, neutrino_spectrum):
+                vector = spectrum(process, grid)
+                scalar = [spectrum(process, K) for K in grid]
+                assert np.allclose(vector, scalar, rtol=1e-12)
+            print("vectorized kernel: PASS")
+        except Exception as e:
+            print(f"vectorized kernel: FAIL - {e}")
+
+    # Test cached Fermi tables against the exact Coulomb amplitudes
+    if beta_pathes:
+        try:
+            _, exact_beta, exact_nu = beta_decay_spectrum(start_iso, beta_pathes)
+            _, table_beta, table_nu = beta_decay_spectrum(start_iso, beta_pathes, tables=True)
+            assert np.allclose(table_beta, exact_beta, rtol=1e-5)
+            assert np.allclose(table_nu, exact_nu, rtol=1e-5)
+            print("Fermi tables: PASS")
+        except Exception as e:
+            print(f"Fermi tables: FAIL - {e}")
+
+    # Test every installed kernel backend against the NumPy reference
+    if beta_pathes:
+        try:
+            from sins.backends import available_backends, current_backend, use_backend
+            for isotope in ('Cs-137', 'Co-57', 'Cd-109', 'Ir-192'):
+                start, pathes, _ = read_file(f'./{isotope}/{isotope.lower()}.csv')
+                if not pathes:
+                    continue
+                _, reference_beta, reference_nu = beta_decay_spectrum(start, pathes)
+                for name in available_backends():
+                    with use_backend(name):
+                        _, backend_beta, backend_nu = beta_decay_spectrum(start, pathes)
+                    assert np.allclose(backend_beta, reference_beta, rtol=1e-10, atol=0), isotope + ' ' + name
+                    assert np.allclose(backend_nu, reference_nu, rtol=1e-10, atol=0), isotope + ' ' + name
+            assert current_backend() == 'numpy'
+            print(f"kernel backends: PASS - {', '.join(available_backends())}")
+        except Exception as e:
+            print(f"kernel backends: FAIL - {e}")
+
+    # Test the exact Coulomb amplitudes against their limits, the approximation and the exact tables
+    if beta_pathes:
+        try:
+            from scipy.special import hyp1f1
+            from sins import beta
+            from sins.beta import exact_amplitudes, kummer_M, use_coulomb, μ
+            z = 2j * np.linspace(0.01, 2, 20)
+            assert np.allclose(kummer_M(2.5, 3.5, z), hyp1f1(2.5, 3.5, z), rtol=1e-12)
+            W = np.linspace(1.001, 1.5, 50)
+            plus, minus = exact_amplitudes(3, 1e-4, W, 3)[0]
+            assert np.allclose(plus + minus, abs(μ(1, 1e-4, W, 3))**2 + abs(μ(-1, 1e-4, W, 3))**2, rtol=1e-4)
+            terms = [plus + minus for plus, minus in exact_amplitudes(3, 1e-4, W, 3)]
+            assert np.allclose(terms[1] / terms[0], 1, rtol=1e-4) and np.allclose(terms[2] / terms[0], 1, rtol=1e-4)
+            import warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', RuntimeWarning)
+                at_rest = exact_amplitudes(2, 77, np.array([1., 1.5]), 192)
+            assert all(np.isnan(a[0]) and np.isfinite(a[1]) for pair in at_rest for a in pair)
+            _, approximate_beta, approximate_nu = beta_decay_spectrum(start_iso, beta_pathes)
+            with use_coulomb('exact'):
+                assert beta.COULOMB_MODE == 'exact'
+                _, exact_beta, exact_nu = beta_decay_spectrum(start_iso, beta_pathes)
+                _, table_beta, table_nu = beta_decay_spectrum(start_iso, beta_pathes, tables=True)
+            assert beta.COULOMB_MODE == 'approximate'
+            assert np.all(np.isfinite(exact_beta)) and np.all(np.isfinite(exact_nu))
+            assert np.isclose(np.sum(exact_nu), np.sum(approximate_nu), rtol=1e-3)
+            assert np.allclose(exact_beta, approximate_beta, rtol=0.1, atol=1e-6)
+            assert not np.allclose(exact_beta, approximate_beta, rtol=1e-6, atol=0)
+            assert np.allclose(table_beta, exact_beta, rtol=1e-5) and np.allclose(table_nu, exact_nu, rtol=1e-5)
+            # worker processes use the Coulomb mode and kernel backend of the caller
+            from concurrent.futures import ProcessPoolExecutor
+            from sins.backends import available_backends, use_backend
+            min_cost, beta.PARALLEL_MIN_COST = beta.PARALLEL_MIN_COST, 0
+            try:
+                with ProcessPoolExecutor(2) as pool:
+                    with use_coulomb('exact'):
+                        _, pool_beta, pool_nu = beta_decay_spectrum(start_iso, beta_pathes, executor=pool)
+                    with use_backend(available_backends()[-1]):
+                        serial_backend = beta_decay_spectrum(start_iso, beta_pathes)[2]
+                        pool_backend = beta_decay_spectrum(start_iso, beta_pathes, executor=pool)[2]
+            finally:
+                beta.PARALLEL_MIN_COST = min_cost
+            assert np.array_equal(pool_beta, exact_beta) and np.array_equal(pool_nu, exact_nu)
+            assert np.array_equal(pool_backend, serial_backend)
+            print("exact Coulomb amplitudes: PASS")
+        except Exception as e:
+            print(f"exact Coulomb amplitudes: FAIL - {e}")
+
+    # Test batched Gauss-Legendre rates against adaptive quadrature
+    if beta_pathes:
+        try:
+            from scipy.integrate import quad
+            from sins.beta import path_rates
+            rates = path_rates(start_iso, beta_pathes, threshold=100.)
+            for i, path in enumerate(beta_pathes):
+                process = SetDecayProcess(Isotope(*start_iso[:5]), Isotope(*path[:5]), path[5])
+                spectrum = lambda K: beta_spectrum(process, K)
+                rate = quad(spectrum, 0, path[5], limit=200)[0]
+                assert abs(rates['rate'][i] / rate - 1) < 1e-8
+                assert abs(rates['beta_above'][i] - quad(spectrum, 100., path[5], limit=200)[0] / rate) < 1e-8
+                assert abs(rates['mean_beta'][i] + rates['mean_nu'][i] - path[5]) < 1e-9
+            print("decay rates: PASS")
+        except Exception as e:
+            print(f"decay rates: FAIL - {e}")
+
+    # Test reweighting stored path shapes against a full recomputation
+    if beta_pathes:
+        try:
+            from sins.reweight import PathSpectra
+            shapes = PathSpectra(start_iso, beta_pathes, grid='adaptive')
+            branching = np.linspace(0.1, 1, len(beta_pathes))
+            new_pathes = [path[:6] + (ratio,) for path, ratio in zip(beta_pathes, branching)]
+            energies, total_beta, total_nu = beta_decay_spectrum(start_iso, new_pathes, grid='adaptive')
+            reweighted = shapes.spectrum(branching)
+            assert np.array_equal(energies, reweighted[0])
+            assert np.allclose(total_beta, reweighted[1], rtol=1e-12, atol=1e-15)
+            assert np.allclose(total_nu, reweighted[2], rtol=1e-12, atol=1e-15)
+            moved = [path[:5] + (path[5] + 10,) + path[6:] if i == 0 else path for i, path in enumerate(new_pathes)]
+            energies, _, total_nu = beta_decay_spectrum(start_iso, moved, grid='adaptive')
+            reweighted = shapes.with_q({0: moved[0][5]}).spectrum(branching)
+            assert np.allclose(total_nu, reweighted[2], rtol=1e-12, atol=1e-15)
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(2) as pool:
+                moved_shapes = PathSpectra(start_iso, beta_pathes, workers=2, executor=pool).with_q({0: moved[0][5]})
+            assert moved_shapes.executor is pool and moved_shapes.workers == 2
+            print("reweighting: PASS")
+        except Exception as e:
+            print(f"reweighting: FAIL - {e}")
+
+    # Test parallel path evaluation against serial mode
+    if beta_pathes:
+        try:
+            import sins.beta
+            serial = beta_decay_spectrum(start_iso, beta_pathes)
+            min_cost, sins.beta.PARALLEL_MIN_COST = sins.beta.PARALLEL_MIN_COST, 0
+            try:
+                threaded = beta_decay_spectrum(start_iso, beta_pathes, workers=2)
+            finally:
+                sins.beta.PARALLEL_MIN_COST = min_cost
+            assert all(np.array_equal(a, b) for a, b in zip(serial, threaded))
+            print("parallel pathes: PASS")
+        except Exception as e:
+            print(f"parallel pathes: FAIL - {e}")
+
     # Test ec_spectrum if ec paths exist
     if ec_pathes:
         try:
@@ -55,5 +211,330 @@ def run_tests():
     except Exception as e:
         print(f"generate function: FAIL - {e}")
 
+    # Test the indexed decay table of many isotopes and in-memory parsing
+    try:
+        from sins.nuclides import NuclideDB
+        files = [f'./{isotope}/{isotope.lower()}.csv' for isotope in ('Cs-137', 'Co-57', 'Cd-109', 'Ir-192')]
+        tables = [open(file_name).read().rstrip('\n') + '\n' for file_name in files]
+        database = NuclideDB(''.join(tables))
+        assert database.names == ['Cs-137', 'Co-57', 'Cd-109', 'Ir-192']
+        for file_name, table in zip(files, tables):
+            parsed = read_file(file_name)
+            assert database[parsed[0][0]] == parsed == read_file(table)
+        import warnings
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            assert read_file(''.join(tables)) == database['Cs-137']
+        assert any('only the first (Cs-137)' in str(warning.message) for warning in caught)
+        looked_up = generate(start_iso[0], gen_files=False, database=database)
+        assert all(np.array_equal(a, b) for a, b in zip(looked_up, generate(csv_path, gen_files=False)))
+        with tempfile.TemporaryDirectory() as directory:
+            txt_path = os.path.join(directory, 'isotope.txt')
+            with open(txt_path, 'w') as file:
+                file.write(tables[-1].split('\n', 1)[1])
+            assert read_file(txt_path) == read_file(csv_path) and os.listdir(directory) == ['isotope.txt']
+            # commas are valid in paths, and text= never takes the table for a file name
+            os.mkdir(os.path.join(directory, 'a,b'))
+            comma_path = os.path.join(directory, 'a,b', 'isotope,1.csv')
+            with open(comma_path, 'w') as file:
+                file.write(tables[-1])
+            assert read_file(comma_path) == read_file(csv_path)
+            assert generate(start_iso[0], gen_files=False, database=comma_path)[0].shape == looked_up[0].shape
+            assert NuclideDB(text=tables[-1]).names == [start_iso[0]]
+        try:
+            read_file('Start,X,7.5,2,1,1,0,0\nBeta,Y,8,2,1,1,abc,0.5\n')
+            raise AssertionError('a bad table was read')
+        except ValueError as e:
+            assert 'Line 1' in str(e) and 'Line 2' in str(e)
+        print(f"nuclide database: PASS - {len(database)} isotopes")
+    except Exception as e:
+        print(f"nuclide database: FAIL - {e}")
+
+    # Test off-screen plot rendering
+    try:
+        import sys
+        from sins.plotting import downsample, render_many
+        outputs = generate(csv_path, gen_files=False, grid=0.01)
+        energies, values = downsample(outputs[0], outputs[1], 1000)
+        assert len(energies) <= 1002 and values.max() == outputs[1].values.max() and energies[-1] == outputs[0][-1]
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [(outputs[0], outputs[1], 'Neutrino', 'A', os.path.join(directory, 'a.png')),
+                    (outputs[0], 2 * outputs[1], 'Neutrino', 'B', os.path.join(directory, 'b.png'))]
+            assert render_many(jobs, workers=2, max_points=1000) == [job[4] for job in jobs]
+            assert sorted(os.listdir(directory)) == ['a.png', 'b.png']
+        assert 'matplotlib.pyplot' not in sys.modules
+        print("plot rendering: PASS")
+    except Exception as e:
+        print(f"plot rendering: FAIL - {e}")
+
+    # Test the memory-mapped spectrum library
+    try:
+        from sins.library import SpectrumLibrary
+        with tempfile.TemporaryDirectory() as directory:
+            library_file = os.path.join(directory, 'spectra.sinslib')
+            library = SpectrumLibrary(library_file)
+            results = library.build(['./Cs-137/cs-137.csv', csv_path, './missing.csv'], workers=1)
+            assert [r[1] for r in results] == ['Cs-137', start_iso[0], None] and results[2][2] is not None
+            outputs = generate(csv_path, gen_files=False)
+            reader = SpectrumLibrary(library_file)
+            energies, values = reader.spectrum(start_iso[0])
+            assert isinstance(values, np.memmap) and not values.flags.writeable
+            assert np.array_equal(energies, outputs[0]) and np.array_equal(values, outputs[1])
+            assert np.array_equal(reader.spectrum(start_iso[0], 'Beta')[1], outputs[3])
+            size = os.path.getsize(library_file)
+            library.add(start_iso[0], generate(csv_path, gen_files=False, grid=0.5), {'grid': 0.5})
+            assert os.path.getsize(library_file) > size and library.garbage() > 0
+            os.chmod(library_file, 0o644)
+            library.compact()
+            assert os.stat(library_file).st_mode & 0o777 == 0o644
+            assert library.garbage() < 64 * 8 and len(library.spectrum(start_iso[0])[0]) > len(outputs[0])
+            assert np.array_equal(library.spectrum('Cs-137')[1], SpectrumLibrary(library_file).spectrum('cs-137')[1])
+            # the command line builds a library on the grid it is given
+            import contextlib, io
+            from sins.sins import main
+            grid_file = os.path.join(directory, 'grid.sinslib')
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert main(['./Cs-137/cs-137.csv', '-j', '1', '--library', grid_file, '--width', '0.5']) == 0
+            assert np.array_equal(SpectrumLibrary(grid_file).spectrum('Cs-137')[0], generate('./Cs-137/cs-137.csv', False, grid=0.5)[0])
+            del energies, values, reader
+        print("spectrum library: PASS")
+    except Exception as e:
+        print(f"spectrum library: FAIL - {e}")
+
+    # Test adding spectra on different grids
+    try:
+        total = Spectrum([0, 1, 2], [1, 1, 1]) + 2 * Spectrum([1.5, 2.5], [1, 1])
+        assert np.array_equal(total.energies, [0, 1, 1.5, 2, 2.5])
+        assert np.array_equal(total.values, [1, 1, 3, 3, 2])
+        assert total.integrate() == 4.75
+        print("Spectrum: PASS")
+    except Exception as e:
+        print(f"Spectrum: FAIL - {e}")
+
+    # Test adaptive energy grid normalization
+    try:
+        total = sum(path[6] for path in beta_pathes) + sum(path[1] for path in ec_pathes)
+        results = generate(csv_path, gen_files=False, grid='adaptive')
+        assert abs(np.dot(trapezoid_weights(results[0]), results[1]) - total) < 1e-3
+        print(f"adaptive grid: PASS - {len(results[0])} energies")
+    except Exception as e:
+        print(f"adaptive grid: FAIL - {e}")
+
+    # Test the result cache
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = generate(csv_path, gen_files=False, cache=cache_dir)
+            second = generate(csv_path, gen_files=False, cache=cache_dir)
+            assert len(os.listdir(cache_dir)) == 1
+            assert all(np.array_equal(a, b) for a, b in zip(first, second))
+            # a small cache evicts on store, and drops the old temporary files of crashed writers
+            from sins.cache import ResultCache
+            entry_size = os.path.getsize(os.path.join(cache_dir, os.listdir(cache_dir)[0]))
+            stale, fresh = os.path.join(cache_dir, 'stale.tmp'), os.path.join(cache_dir, 'fresh.tmp')
+            for name in (stale, fresh):
+                open(name, 'wb').close()
+            os.utime(stale, (0, 0))
+            small = ResultCache(cache_dir, max_bytes=entry_size * 2)
+            assert not os.path.exists(stale) and os.path.exists(fresh)
+            for i in range(5):
+                small.store(str(i), first)
+            assert sorted(name for name in os.listdir(cache_dir) if name.endswith('.npz')) == ['3.npz', '4.npz']
+        print("result cache: PASS")
+    except Exception as e:
+        print(f"result cache: FAIL - {e}")
+
+    # Test a decaying two isotope inventory
+    try:
+        from sins.inventory import Inventory
+        half_life = 73.83 * 86400
+        inventory = Inventory([(csv_path, 2e5, half_life), ('./Cs-137/cs-137.csv', 1e5, np.inf)])
+        energies, beta, nu = inventory.spectra([0, half_life])
+        assert nu.shape == (2, len(energies))
+        total = sum(path[6] for path in beta_pathes) + sum(path[1] for path in ec_pathes)
+        rates = nu @ trapezoid_weights(energies)
+        assert abs(rates[0] - rates[1] - 1e5 * total) < 1e-3 * rates[0]
+        _, _, window = inventory.integrated(0, half_life)
+        times = np.linspace(0, half_life, 201)
+        assert np.allclose(window[0], trapezoid_weights(times) @ inventory.spectra(times)[2], rtol=1e-4, atol=1e-6)
+        print("inventory: PASS")
+    except Exception as e:
+        print(f"inventory: FAIL - {e}")
+
+    # Test uncertainty ensembles
+    if beta_pathes:
+        try:
+            from sins.ensemble import ensemble
+            _, nominal_beta, nominal_nu = beta_decay_spectrum(start_iso, beta_pathes, grid=0.25)
+            nominal = ensemble(start_iso, beta_pathes, samples=2)
+            inside = ~np.isin(nominal.energies, [path[5] for path in beta_pathes])
+            assert np.allclose(nominal.nu[:, inside], nominal_nu.at(nominal.energies)[inside], rtol=0, atol=1e-5 * nominal_nu.values.max())
+            assert np.allclose(nominal.beta, nominal_beta.at(nominal.energies), rtol=0, atol=1e-5 * nominal_beta.values.max())
+            varied = ensemble(start_iso, beta_pathes, samples=200, q_sigma=1., br_sigma=0.002, spins={0: [3, 4, 5]}, rng=1)
+            chunked = ensemble(start_iso, beta_pathes, samples=200, q_sigma=1., br_sigma=0.002, spins={0: [3, 4, 5]}, rng=1, chunk_size=30)
+            assert np.allclose(varied.nu, chunked.nu, rtol=1e-12, atol=0)
+            low, median, high = varied.percentiles()
+            assert (low <= median).all() and (median <= high).all()
+            assert varied.covariance().shape == (len(varied.energies),) * 2
+            print("uncertainty ensemble: PASS")
+        except Exception as e:
+            print(f"uncertainty ensemble: FAIL - {e}")
+
+    # Test sampling neutrino energies
+    try:
+        from sins.sampler import Sampler
+        sampler = Sampler.from_file(csv_path)
+        samples = sampler.sample(400000, rng=7)
+        assert np.array_equal(sampler.sample(1000, rng=3), sampler.sample(1000, rng=3))
+        assert abs(samples.mean() - sampler.mean()) < 5 * samples.std() / np.sqrt(len(samples))
+        line_fraction = np.isin(samples, [path[0] for path in ec_pathes]).mean()
+        assert abs(line_fraction - sampler.weights[:-1].sum() / sampler.weights.sum()) < 0.005
+        assert sum(len(chunk) for chunk in sampler.stream(25000, chunk_size=10000, rng=1)) == 25000
+        print("sampler: PASS")
+    except Exception as e:
+        print(f"sampler: FAIL - {e}")
+
+    # Test response folding (FFT for constant resolution, sparse matrix otherwise)
+    try:
+        from sins.response import Response, ibd_cross_section
+        outputs = generate(csv_path, gen_files=False)
+        energies = np.arange(-200, 1000, 2.)
+        counts = np.dot(trapezoid_weights(outputs[0]), outputs[1])
+        fft = Response(energies, 15.).fold_outputs(outputs)
+        assert abs(np.dot(trapezoid_weights(energies), fft) / counts - 1) < 1e-3
+        sparse = Response(energies, lambda E: np.full(E.shape, 15.))
+        assert np.allclose(sparse.fold_outputs([outputs, outputs]), fft, rtol=0, atol=5e-3 * fft.max())
+        assert len(sparse._matrices) == 1
+        assert not Response(energies, 15., ibd_cross_section).fold_outputs(outputs).any()
+        print("response folding: PASS")
+    except Exception as e:
+        print(f"response folding: FAIL - {e}")
+
+    # Test instrumentation of generate
+    try:
+        from sins.instrument import collect
+        collected = []
+        generate(csv_path, gen_files=False, stats=collected.append)
+        stats = collected[0]
+        assert stats.timers['run_path'][0] == len(beta_pathes)
+        assert stats.counters['energy points'] > 0 and stats.counters['μ calls'] > 0
+        with collect(profile=True) as stats:
+            read_file(csv_path)
+        assert stats.profile is not None and 'run_path' not in stats.timers
+        # pool threads record into the caller's block; blocks in other threads stay apart
+        import threading
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        from sins import beta
+        min_cost, beta.PARALLEL_MIN_COST = beta.PARALLEL_MIN_COST, 0
+        try:
+            with collect() as stats, ThreadPoolExecutor(2) as pool:
+                beta.run_pathes(start_iso, beta_pathes, executor=pool)
+            # worker processes are not instrumented, but still run inside a block
+            with collect() as process_stats, ProcessPoolExecutor(2) as pool:
+                in_processes = beta.run_pathes(start_iso, beta_pathes, executor=pool)
+        finally:
+            beta.PARALLEL_MIN_COST = min_cost
+        assert stats.timers['run_path'][0] == len(beta_pathes) and 'run_path' not in process_stats.timers
+        assert all(np.array_equal(a[1], b[1]) for a, b in zip(in_processes, beta.run_pathes(start_iso, beta_pathes)))
+        entered, done = threading.Barrier(2), threading.Event()
+        others = []
+        def other_block():
+            with collect() as other:
+                entered.wait()
+                done.wait()
+            others.append(other)
+        thread = threading.Thread(target=other_block)
+        thread.start()
+        with collect() as stats:
+            entered.wait()
+            read_file(csv_path)
+        done.set()
+        thread.join()
+        assert stats.timers['read_file'][0] == 1 and 'read_file' not in others[0].timers
+        print("instrumentation: PASS")
+    except Exception as e:
+        print(f"instrumentation: FAIL - {e}")
+
+    # Test batch generation, including a failing file
+    try:
+        results = generate_many([csv_path, './missing.csv'], gen_files=False, workers=2)
+        assert [r[0] for r in results] == [csv_path, './missing.csv']
+        assert results[0][2] is None and results[1][1] is None
+        print(f"generate_many: PASS - {len(results)} results in input order")
+    except Exception as e:
+        print(f"generate_many: FAIL - {e}")
+
+    # Test the spectrum server: results equal to generate, warm hits and merged identical requests
+    try:
+        import contextlib
+        import io
+        import json
+        import threading
+        from sins.client import SpectrumClient
+        from sins.server import SpectrumServer
+        with tempfile.TemporaryDirectory() as directory:
+            server = SpectrumServer(workers=2)
+            address = server.run_in_thread(path=os.path.join(directory, 'sins.sock'))
+            try:
+                with SpectrumClient(address) as client:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        reference = generate(csv_path, False)
+                    outputs = client.generate(csv_path)
+                    assert all(np.array_equal(np.asarray(a), b) for a, b in zip(reference, outputs))
+                    assert client.read_file(csv_path) == read_file(csv_path)
+                    client.generate(csv_path)
+                    assert client.stats()['hits'] == 1 and client.stats()['misses'] == 2
+
+                    results = []
+                    def request():
+                        with SpectrumClient(address) as other:
+                            results.append(other.beta_decay_spectrum(csv_path, grid=0.5))
+                    threads = [threading.Thread(target=request) for _ in range(4)]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+                    stats = client.stats()
+                    assert len(results) == 4 and stats['misses'] + stats['hits'] + stats['coalesced'] == 7
+                    assert stats['misses'] == 3
+                    try:
+                        client.generate('./missing.csv')
+                        raise AssertionError('a missing file was served')
+                    except ValueError:
+                        pass
+                # other Host names (DNS rebinding) and other content types are refused
+                from sins.client import _UnixConnection
+                body = json.dumps({'file': os.path.abspath(csv_path)})
+                for headers, status in (({'Host': 'attacker.example', 'Content-Type': 'application/json'}, 403),
+                                        ({'Host': 'localhost:8765', 'Content-Type': 'text/plain'}, 415),
+                                        ({'Host': 'localhost:8765', 'Content-Type': 'application/json; charset=utf-8'}, 200)):
+                    connection = _UnixConnection(address)
+                    connection.request('POST', '/read_file', body, headers)
+                    assert connection.getresponse().status == status
+                    connection.close()
+            finally:
+                server.stop()
+        # concurrent misses on one file parse it once, and only max_tables files are kept
+        from sins import server as server_module
+        parsed = []
+        def counted_read_file(path):
+            parsed.append(path)
+            return read_file(path)
+        server_module.read_file, tables_server = counted_read_file, SpectrumServer(workers=1, max_tables=1)
+        try:
+            source = tables_server._source({'file': csv_path})
+            threads = [threading.Thread(target=tables_server._decay_table, args=(source, {})) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            tables_server._decay_table(tables_server._source({'file': './Cs-137/cs-137.csv'}), {})
+            assert len(parsed) == 2 and tables_server.summary()['tables'] == 1
+        finally:
+            server_module.read_file = read_file
+            tables_server.executor.shutdown()
+        print(f"spectrum server: PASS - {stats['coalesced']} requests merged")
+    except Exception as e:
+        print(f"spectrum server: FAIL - {e}")
+
 if __name__ == "__main__":
     run_tests()
\ No newline at end of file